@@ -0,0 +1,121 @@
+import operator
+from collections import deque
+from typing import Deque, Dict, Generic, Iterable, List, Optional
+
+from PriorityQueueFile import Node, T
+
+
+class BucketQueue(Generic[T]):
+    """
+    A priority queue for int priorities that only ever move one way - event-simulation ticks, or Dijkstra's algorithm
+    with int edge weights - where a node added is never allowed to have priority over the last node popped.
+    Instead of a heap, it keeps one bucket per priority, in a dict keyed by priority, and a cursor at the front
+    bucket. add_value appends to a bucket in O(1) amortized, whichever end of the range its priority is at; pop takes
+    from the front bucket, and when that runs dry, moves the cursor forward to the next priority that has a bucket.
+    Once anything has been popped the cursor never goes back, so all of its moves together cost at most the width of
+    the range of priorities, and pops are O(1) amortized when that range is small next to the number of nodes.
+    Nodes with equal priority come out in the order they were added. Make one with PriorityQueue(engine="bucket").
+    """
+
+    def __init__(self, tree: Iterable[Node] = (), is_min_heap: bool = True, heapify: bool = False):
+        """
+        :param tree: (priority, value) nodes to start with.
+        :param is_min_heap: whether lower priorities come out first (the priorities must then never go down from one
+        pop to the next), or higher ones (they must never go up).
+        :param heapify: accepted so that the PriorityQueue arguments work here too; the nodes are always in order.
+        """
+        self.is_min_heap = is_min_heap
+        # buckets are keyed by priority times self._sign, so that nodes always come out from the lowest key up.
+        self._sign = 1 if is_min_heap else -1
+        self._buckets: Dict[int, Deque[T]] = {}
+        self._cursor = 0  # the key of the front bucket, or of somewhere before it
+        self.size = 0
+        self.last_popped: Optional[int] = None
+        self.add_values(tree)
+
+    def __len__(self):
+        return self.size
+
+    def is_empty(self) -> bool:
+        return self.size == 0
+
+    def clear(self):
+        """
+        removes all items from this priority queue, and forgets the last priority popped.
+        :return None:
+        """
+        self._buckets = {}
+        self._cursor = 0
+        self.size = 0
+        self.last_popped = None
+
+    def add_value(self, value: T, priority: int = 1):
+        """
+        adds a node in O(1) amortized.
+        raises a ValueError if priority has priority over the last priority popped, and a TypeError if it isn't an int.
+        :param value: the value to store
+        :param priority: its relative weight
+        :return None:
+        """
+        key = self._sign * operator.index(priority)
+        if self.last_popped is not None and key < self._sign * self.last_popped:
+            raise ValueError(f"Priority {priority} breaks monotonicity: priority {self.last_popped} was already "
+                             f"popped from this BucketQueue.")
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = deque()
+        bucket.append(value)
+        if self.size == 0 or key < self._cursor:
+            self._cursor = key
+        self.size += 1
+
+    def add_values(self, nodes: Iterable[Node]):
+        """
+        adds many (priority, value) nodes.
+        :return None:
+        """
+        for node in nodes:
+            self.add_value(node[1], node[0])
+
+    def _front_key(self) -> int:
+        """
+        moves the cursor forward to the first priority that has a bucket, and gives its key.
+        """
+        if self.size == 0:
+            raise IndexError("Attempted to pop from an empty Queue.")
+        buckets = self._buckets
+        cursor = self._cursor
+        while cursor not in buckets:
+            cursor += 1
+        self._cursor = cursor
+        return cursor
+
+    def peek(self) -> Node:
+        """
+        Gives the node at the start of this queue without removing it.
+        """
+        if self.size == 0:
+            raise IndexError("Attempted to peek at an empty Queue.")
+        key = self._front_key()
+        return self._sign * key, self._buckets[key][0]
+
+    def pop(self) -> Node:
+        """
+        Removes the node at the start of this queue and returns it. From now on, nodes with priority over it can't
+        be added.
+        """
+        key = self._front_key()
+        bucket = self._buckets[key]
+        value = bucket.popleft()
+        if not bucket:
+            del self._buckets[key]
+        priority = self._sign * key
+        self.size -= 1
+        self.last_popped = priority
+        return priority, value
+
+    def pop_many(self, k: int) -> List[Node]:
+        """
+        Removes the first k nodes of this queue (or all of them, if there are fewer than k) and returns them in order.
+        """
+        return [self.pop() for _ in range(min(k, self.size))]
@@ -0,0 +1,185 @@
+from array import array
+from typing import Generic, Iterable, Iterator, List, Optional
+
+from PriorityQueueFile import PriorityQueue, HeapObserver, Node, T
+
+
+class CompactTree(Generic[T]):
+    """
+    Stands in for the list of (priority, value) tuples in PriorityQueue.my_tree, but keeps the priorities in one
+    contiguous array of machine numbers and the values in a parallel list. No tuple is stored per node; one is only
+    made when someone asks for a node, e.g. tree[3].
+    A node takes 8 bytes of array plus one 8-byte list slot, instead of a list slot, a 56-byte tuple and (for most
+    priorities) a separate int object.
+    """
+
+    def __init__(self, typecode: str = "q", nodes: Iterable[Node] = ()):
+        """
+        :param typecode: the array typecode for the priorities - "q" for 64-bit ints or "d" for floats.
+        :param nodes: (priority, value) pairs to start with, in order.
+        """
+        self.priorities = array(typecode)
+        self.values: List[T] = []
+        self.extend(nodes)
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def __getitem__(self, index: int) -> Node:
+        return self.priorities[index], self.values[index]
+
+    def __setitem__(self, index: int, node: Node):
+        self.priorities[index] = node[0]
+        self.values[index] = node[1]
+
+    def __iter__(self) -> Iterator[Node]:
+        return zip(self.priorities, self.values)
+
+    def __eq__(self, other) -> bool:
+        try:
+            return len(self) == len(other) and all(tuple(a) == tuple(b) for a, b in zip(self, other))
+        except TypeError:
+            return NotImplemented
+
+    def __repr__(self):
+        return repr(list(self))
+
+    def append(self, node: Node):
+        self.priorities.append(node[0])
+        self.values.append(node[1])
+
+    def extend(self, nodes: Iterable[Node]):
+        for node in nodes:
+            self.append(node)
+
+    def pop(self) -> Node:
+        """
+        removes and gives back the last node.
+        """
+        if not self.values:
+            raise IndexError("pop from empty CompactTree")
+        return self.priorities.pop(), self.values.pop()
+
+    def clear(self):
+        del self.priorities[:]
+        self.values.clear()
+
+    def reverse(self):
+        self.priorities.reverse()
+        self.values.reverse()
+
+
+class CompactPriorityQueue(PriorityQueue[T]):
+    """
+    A binary PriorityQueue for numeric priorities whose my_tree is a CompactTree. It supports everything
+    PriorityQueue does, but add_value, pop and the heapify methods work straight on the priority array and value
+    list, so no tuples are made or taken apart on the way.
+    """
+
+    def __init__(self, tree: List[Node] = [], is_min_heap: bool = True, heapify: bool = False,
+                 observer: Optional[HeapObserver[T]] = None, typecode: str = "q"):
+        """
+        :param typecode: "q" to store the priorities as 64-bit ints, or "d" to store them as floats.
+        """
+        super().__init__(tree=[], is_min_heap=is_min_heap, observer=observer)
+        self.typecode = typecode
+        self.my_tree: CompactTree[T] = CompactTree(typecode, tree)
+        if heapify:
+            self.build_heap()
+
+    def clear(self):
+        self.my_tree.clear()
+        self._needs_heapify = False
+
+    def add_value(self, value: T, priority: int = 1):
+        """
+        adds a node to this data structure and makes sure that the my_tree data structure is
+        still a heap.
+        :param value: the value to store
+        :param priority: its relative weight
+        :return None:
+        """
+        tree = self.my_tree
+        tree.priorities.append(priority)
+        tree.values.append(value)
+        if not self._needs_heapify:
+            self.heapify_up(len(tree) - 1)
+        if self.observer is not None:
+            self.observer.node_added(self, (priority, value))
+
+    def pop(self) -> Node:
+        """
+        Removes the node at the start of this Priority Queue and resets the Queue so that it is in order; then
+        returns the removed node.
+        """
+        if self.is_empty():
+            raise IndexError("Attempted to pop from an empty Queue.")
+        self._ensure_heap()
+        priorities = self.my_tree.priorities
+        values = self.my_tree.values
+        result = (priorities[0], values[0])
+        last_priority = priorities.pop()
+        last_value = values.pop()
+        if values:
+            priorities[0] = last_priority
+            values[0] = last_value
+            self.heapify_down()
+        if self.observer is not None:
+            self.observer.node_popped(self, result)
+        return result
+
+    def heapify_up(self, index: int):
+        """
+        the same as PriorityQueue.heapify_up, working on the priority array and value list side by side.
+        """
+        priorities = self.my_tree.priorities
+        values = self.my_tree.values
+        if not 0 <= index < len(values):
+            raise IndexError(f"Index {index} is out of bounds for tree of size {len(values)}")
+        before = self._before
+        priority = priorities[index]
+        value = values[index]
+        while index > 0:
+            parent_index = (index - 1) >> 1
+            parent_priority = priorities[parent_index]
+            if not before(priority, parent_priority):
+                break
+            priorities[index] = parent_priority
+            values[index] = values[parent_index]
+            index = parent_index
+        priorities[index] = priority
+        values[index] = value
+
+    def heapify_down(self, index: int = 0, size: Optional[int] = None):
+        """
+        the same as PriorityQueue.heapify_down, working on the priority array and value list side by side.
+        """
+        priorities = self.my_tree.priorities
+        values = self.my_tree.values
+        if size is None:
+            size = len(values)
+        if not 0 <= index < size:
+            return
+        if self.observer is not None:
+            self._heapify_down_traced(index, size)
+            return
+        before = self._before
+        priority = priorities[index]
+        value = values[index]
+        child_index = 2 * index + 1
+        while child_index < size:
+            child_priority = priorities[child_index]
+            right_index = child_index + 1
+            if right_index < size:
+                right_priority = priorities[right_index]
+                if before(right_priority, child_priority):  # when the children are equal, we go left.
+                    child_index = right_index
+                    child_priority = right_priority
+            if not before(child_priority, priority):
+                break
+            priorities[index] = child_priority
+            values[index] = values[child_index]
+            index = child_index
+            child_index = 2 * index + 1
+        priorities[index] = priority
+        values[index] = value
@@ -0,0 +1,229 @@
+import asyncio
+import threading
+import time
+from typing import Generic, List, Optional, Tuple
+
+from PriorityQueueFile import PriorityQueue, HeapObserver, Node, T
+"""
+Wrappers that let several threads, or several asyncio tasks, share one PriorityQueue. Both do all their heap work
+through the wrapped queue's own add_value/pop, while holding a lock only for that heap work. Whatever observer the
+wrapped queue had is taken off it and called after the lock is released.
+"""
+
+
+class _EventLog(HeapObserver[T]):
+    """
+    stands in for the wrapped queue's observer while the lock is held, keeping the adds and pops it is told about
+    so that they can be passed on to the real observer once the lock is released.
+    """
+
+    def __init__(self):
+        self.events: List[Tuple[bool, Node]] = []  # (whether it was an add, the node)
+
+    def node_added(self, queue: PriorityQueue[T], node: Node):
+        self.events.append((True, node))
+
+    def node_popped(self, queue: PriorityQueue[T], node: Node):
+        self.events.append((False, node))
+
+    def replay(self, observer: HeapObserver[T], queue: PriorityQueue[T]):
+        for added, node in self.events:
+            if added:
+                observer.node_added(queue, node)
+            else:
+                observer.node_popped(queue, node)
+
+
+def _add_logged(queue: PriorityQueue[T], value: T, priority: int, log: Optional[_EventLog[T]]) -> Optional[Node]:
+    """
+    adds a node through queue.add_value, with log (if any) as the queue's observer for the length of the call, so
+    that a bounded queue's evictions and rejections are recorded just as the queue itself reports them.
+    :return: what add_value returns
+    """
+    queue.observer = log
+    try:
+        return queue.add_value(value, priority)
+    finally:
+        queue.observer = None
+
+
+class ThreadSafePriorityQueue(Generic[T]):
+    """
+    A PriorityQueue that any number of threads can put to and pop from. pop waits (optionally up to a timeout) for
+    something to arrive, instead of raising right away on an empty queue; with a maxsize, put waits for room.
+    """
+
+    def __init__(self, queue: Optional[PriorityQueue[T]] = None, maxsize: int = 0):
+        """
+        :param queue: the heap to share; a new min heap if not given. Don't use it directly from here on.
+        :param maxsize: if more than 0, put blocks while the queue holds this many nodes.
+        """
+        self.queue: PriorityQueue[T] = queue if queue is not None else PriorityQueue()
+        self.observer: Optional[HeapObserver[T]] = self.queue.observer
+        self.queue.observer = None
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._not_empty = threading.Condition(self._lock)
+        self._not_full = threading.Condition(self._lock)
+
+    def __len__(self):
+        with self._lock:
+            return len(self.queue)
+
+    def is_empty(self) -> bool:
+        with self._lock:
+            return self.queue.is_empty()
+
+    @staticmethod
+    def _wait_for(condition: threading.Condition, ready, block: bool, timeout: Optional[float], message: str):
+        """
+        waits on condition until ready() is true. The caller must be holding the condition's lock.
+        raises an IndexError with message if block is False and we'd have to wait, or if the timeout runs out.
+        """
+        if ready():
+            return
+        if not block:
+            raise IndexError(message)
+        if timeout is None:
+            while not ready():
+                condition.wait()
+            return
+        deadline = time.monotonic() + timeout
+        while not ready():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise IndexError(message)
+            condition.wait(remaining)
+
+    def put(self, value: T, priority: int = 1, block: bool = True, timeout: Optional[float] = None) -> Optional[Node]:
+        """
+        adds a node, first waiting for room if this queue has a maxsize and is full.
+        :param block: if False, raise right away instead of waiting.
+        :param timeout: the most seconds to wait; None waits for as long as it takes.
+        raises an IndexError if there is still no room when we stop waiting.
+        :return: None - unless the wrapped queue has a max_size and is full, in which case the node that did not fit,
+        as PriorityQueue.add_value gives it
+        """
+        log = _EventLog() if self.observer is not None else None
+        with self._not_full:
+            self._wait_for(self._not_full, lambda: self.maxsize <= 0 or len(self.queue) < self.maxsize, block,
+                           timeout, "Attempted to put to a full Queue.")
+            result = _add_logged(self.queue, value, priority, log)
+            self._not_empty.notify()
+        if log is not None:
+            log.replay(self.observer, self.queue)
+        return result
+
+    def pop(self, block: bool = True, timeout: Optional[float] = None) -> Node:
+        """
+        removes and returns the node at the start of the queue, first waiting for one if the queue is empty.
+        :param block: if False, raise right away instead of waiting.
+        :param timeout: the most seconds to wait; None waits for as long as it takes.
+        raises an IndexError if the queue is still empty when we stop waiting.
+        """
+        with self._not_empty:
+            self._wait_for(self._not_empty, lambda: not self.queue.is_empty(), block, timeout,
+                           "Attempted to pop from an empty Queue.")
+            node = self.queue.pop()
+            self._not_full.notify()
+        if self.observer is not None:
+            self.observer.node_popped(self.queue, node)
+        return node
+
+    def pop_many(self, k: int, block: bool = True, timeout: Optional[float] = None) -> List[Node]:
+        """
+        waits, as pop does, until there is at least one node, then removes and returns up to k of them in order.
+        """
+        with self._not_empty:
+            self._wait_for(self._not_empty, lambda: not self.queue.is_empty(), block, timeout,
+                           "Attempted to pop from an empty Queue.")
+            nodes = self.queue.pop_many(k)
+            self._not_full.notify(len(nodes))
+        if self.observer is not None:
+            for node in nodes:
+                self.observer.node_popped(self.queue, node)
+        return nodes
+
+    def peek(self) -> Node:
+        """
+        Gives the node at the start of the queue without removing it; it may be gone by the time you use it.
+        raises an IndexError if the queue is empty.
+        """
+        with self._lock:
+            return self.queue.peek()
+
+
+class AsyncPriorityQueue(Generic[T]):
+    """
+    A PriorityQueue for asyncio tasks on one event loop: await pop() waits for a node to arrive, and with a maxsize,
+    await put() waits for room. To give up after a while, wrap either one in asyncio.wait_for.
+    """
+
+    def __init__(self, queue: Optional[PriorityQueue[T]] = None, maxsize: int = 0):
+        """
+        :param queue: the heap to share; a new min heap if not given. Don't use it directly from here on.
+        :param maxsize: if more than 0, put waits while the queue holds this many nodes.
+        """
+        self.queue: PriorityQueue[T] = queue if queue is not None else PriorityQueue()
+        self.observer: Optional[HeapObserver[T]] = self.queue.observer
+        self.queue.observer = None
+        self.maxsize = maxsize
+        self._lock = asyncio.Lock()
+        self._not_empty = asyncio.Condition(self._lock)
+        self._not_full = asyncio.Condition(self._lock)
+
+    def __len__(self):
+        return len(self.queue)
+
+    def is_empty(self) -> bool:
+        return self.queue.is_empty()
+
+    def is_full(self) -> bool:
+        return 0 < self.maxsize <= len(self.queue)
+
+    async def put(self, value: T, priority: int = 1) -> Optional[Node]:
+        """
+        adds a node, first waiting for room if this queue has a maxsize and is full.
+        :return: None - unless the wrapped queue has a max_size and is full, in which case the node that did not fit,
+        as PriorityQueue.add_value gives it
+        """
+        log = _EventLog() if self.observer is not None else None
+        async with self._not_full:
+            await self._not_full.wait_for(lambda: not self.is_full())
+            result = _add_logged(self.queue, value, priority, log)
+            self._not_empty.notify()
+        if log is not None:
+            log.replay(self.observer, self.queue)
+        return result
+
+    async def pop(self) -> Node:
+        """
+        removes and returns the node at the start of the queue, first waiting for one if the queue is empty.
+        """
+        async with self._not_empty:
+            await self._not_empty.wait_for(lambda: not self.is_empty())
+            node = self.queue.pop()
+            self._not_full.notify()
+        if self.observer is not None:
+            self.observer.node_popped(self.queue, node)
+        return node
+
+    async def pop_many(self, k: int) -> List[Node]:
+        """
+        waits, as pop does, until there is at least one node, then removes and returns up to k of them in order.
+        """
+        async with self._not_empty:
+            await self._not_empty.wait_for(lambda: not self.is_empty())
+            nodes = self.queue.pop_many(k)
+            self._not_full.notify(len(nodes))
+        if self.observer is not None:
+            for node in nodes:
+                self.observer.node_popped(self.queue, node)
+        return nodes
+
+    def peek(self) -> Node:
+        """
+        Gives the node at the start of the queue without removing it.
+        raises an IndexError if the queue is empty.
+        """
+        return self.queue.peek()
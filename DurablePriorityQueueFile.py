@@ -0,0 +1,222 @@
+import os
+import pickle
+import re
+import struct
+import time
+import zlib
+from typing import Generic, Iterable, List, Optional
+
+from PriorityQueueFile import PriorityQueue, Node, T
+"""
+A PriorityQueue that survives a crash. Every add and pop is appended as a small record to a write-ahead log in a
+directory of its own, and checkpoint() saves a snapshot (with PriorityQueue.save) and starts a new log. On start-up,
+the newest snapshot is loaded and the logs written since are replayed on top of it.
+The directory holds snapshot-<n>.pq and wal-<n>.log files: snapshot n holds everything before log n.
+"""
+
+# each log record is this header - what kind of record, how long its body is, and the body's crc32 - then the body.
+RECORD_HEADER = struct.Struct("<cII")
+ADD = b"a"  # body: the pickled (priority, value)
+ADD_MANY = b"m"  # body: a pickled list of (priority, value)s
+POP = b"p"  # body: how many nodes were popped, as a 4-byte int
+POP_COUNT = struct.Struct("<I")
+
+
+class DurablePriorityQueue(Generic[T]):
+    """
+    Wraps a PriorityQueue so that its adds and pops are logged to disk. Records are gathered into groups and each
+    group is written (and, by default, fsynced) in one go, so that most adds and pops don't wait for the disk. The
+    price is that the records of a group not yet written are lost in a crash; group_size=1 makes every record durable
+    before add_value or pop returns. Use it from one thread at a time.
+    """
+
+    def __init__(self, directory: str, group_size: int = 64, fsync: bool = True,
+                 group_interval: Optional[float] = None, **queue_options):
+        """
+        :param directory: where the snapshots and logs live; made if it doesn't exist. If it holds an earlier run's
+        files, the queue is recovered from them.
+        :param group_size: how many records to gather before writing them. 1 writes each record as it is made.
+        :param fsync: whether to fsync the log after writing each group. Without it, a written group is safe from
+        the program crashing but not from the machine crashing.
+        :param group_interval: if given, a group is also written once its first record is this many seconds old
+        (checked whenever a record is added).
+        :param queue_options: arguments for the PriorityQueue, as in PriorityQueue(); give the same ones each run.
+        """
+        if group_size < 1:
+            raise ValueError(f"A group needs at least one record, not {group_size}.")
+        self.directory = directory
+        self.group_size = group_size
+        self.fsync = fsync
+        self.group_interval = group_interval
+        self.queue_options = queue_options
+        self._group = bytearray()
+        self._group_records = 0
+        self._group_started = 0.0
+        os.makedirs(directory, exist_ok=True)
+        self.queue: PriorityQueue[T] = self._recover()
+        self._log = open(self._log_path(self.generation), "ab")
+
+    def _snapshot_path(self, generation: int) -> str:
+        return os.path.join(self.directory, f"snapshot-{generation}.pq")
+
+    def _log_path(self, generation: int) -> str:
+        return os.path.join(self.directory, f"wal-{generation}.log")
+
+    def _generations(self, pattern: str) -> List[int]:
+        return sorted(int(match.group(1)) for match in map(re.compile(pattern).fullmatch, os.listdir(self.directory))
+                      if match)
+
+    def _recover(self) -> PriorityQueue[T]:
+        """
+        loads the newest snapshot, replays every log written since, and sets self.generation to the newest log.
+        A record cut short by a crash ends its log; the log is truncated there.
+        """
+        snapshots = self._generations(r"snapshot-(\d+)\.pq")
+        logs = self._generations(r"wal-(\d+)\.log")
+        if snapshots:
+            base = snapshots[-1]
+            load_options = {key: value for key, value in self.queue_options.items()
+                            if key not in ("is_min_heap", "arity")}  # these come from the snapshot.
+            queue = PriorityQueue.load(self._snapshot_path(base), **load_options)
+        else:
+            base = 0
+            queue = PriorityQueue(**self.queue_options)
+        self.generation = base
+        for generation in logs:
+            if generation >= base:
+                self._replay(queue, self._log_path(generation))
+                self.generation = generation
+        return queue
+
+    @staticmethod
+    def _replay(queue: PriorityQueue[T], path: str):
+        """
+        applies the records in the log at path to queue, in order.
+        """
+        with open(path, "r+b") as file:
+            data = file.read()
+            position = 0
+            while position + RECORD_HEADER.size <= len(data):
+                kind, length, checksum = RECORD_HEADER.unpack_from(data, position)
+                body = data[position + RECORD_HEADER.size:position + RECORD_HEADER.size + length]
+                if len(body) < length or zlib.crc32(body) != checksum:
+                    break
+                if kind == ADD:
+                    priority, value = pickle.loads(body)
+                    queue.add_value(value, priority)
+                elif kind == ADD_MANY:
+                    queue.add_values(pickle.loads(body))
+                elif kind == POP:
+                    queue.pop_many(POP_COUNT.unpack(body)[0])
+                else:
+                    break
+                position += RECORD_HEADER.size + length
+            if position < len(data):
+                file.truncate(position)
+
+    def _append_record(self, kind: bytes, body: bytes):
+        """
+        adds a record to the current group, and writes the group out if it is full or old enough.
+        """
+        if not self._group_records:
+            self._group_started = time.monotonic()
+        self._group += RECORD_HEADER.pack(kind, len(body), zlib.crc32(body))
+        self._group += body
+        self._group_records += 1
+        if self._group_records >= self.group_size or (
+                self.group_interval is not None and time.monotonic() - self._group_started >= self.group_interval):
+            self.commit()
+
+    def commit(self):
+        """
+        writes out (and, with fsync, fsyncs) every record gathered so far. After this, they survive a crash.
+        :return None:
+        """
+        if self._group:
+            self._log.write(self._group)
+            self._group.clear()
+            self._group_records = 0
+        self._log.flush()
+        if self.fsync:
+            os.fsync(self._log.fileno())
+
+    def checkpoint(self):
+        """
+        saves a snapshot of the queue and starts a new, empty log, then deletes the old snapshot and logs. A crash
+        part way through leaves enough files behind to recover from.
+        :return None:
+        """
+        self.commit()
+        self._log.close()
+        self.generation += 1
+        self._log = open(self._log_path(self.generation), "ab")
+        self.queue.save(self._snapshot_path(self.generation))
+        for generation in self._generations(r"snapshot-(\d+)\.pq"):
+            if generation < self.generation:
+                os.remove(self._snapshot_path(generation))
+        for generation in self._generations(r"wal-(\d+)\.log"):
+            if generation < self.generation:
+                os.remove(self._log_path(generation))
+
+    def close(self):
+        """
+        commits what is left and closes the log. The queue can't be changed after this.
+        :return None:
+        """
+        if not self._log.closed:
+            self.commit()
+            self._log.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        return len(self.queue)
+
+    def is_empty(self) -> bool:
+        return self.queue.is_empty()
+
+    def add_value(self, value: T, priority: int = 1):
+        """
+        adds a node to the queue, and logs it.
+        :param value: the value to store; it must be picklable
+        :param priority: its relative weight
+        :return None:
+        """
+        self.queue.add_value(value, priority)
+        self._append_record(ADD, pickle.dumps((priority, value), pickle.HIGHEST_PROTOCOL))
+
+    def add_values(self, nodes: Iterable[Node]):
+        """
+        adds many (priority, value) nodes, as one log record.
+        :return None:
+        """
+        nodes = list(nodes)
+        self.queue.add_values(nodes)
+        self._append_record(ADD_MANY, pickle.dumps(nodes, pickle.HIGHEST_PROTOCOL))
+
+    def peek(self) -> Node:
+        """
+        Gives the node at the start of the queue without removing it.
+        """
+        return self.queue.peek()
+
+    def pop(self) -> Node:
+        """
+        Removes the node at the start of the queue and returns it, and logs that it is gone.
+        """
+        node = self.queue.pop()
+        self._append_record(POP, POP_COUNT.pack(1))
+        return node
+
+    def pop_many(self, k: int) -> List[Node]:
+        """
+        Removes the first k nodes of the queue and returns them in order, as one log record.
+        """
+        nodes = self.queue.pop_many(k)
+        if nodes:
+            self._append_record(POP, POP_COUNT.pack(len(nodes)))
+        return nodes
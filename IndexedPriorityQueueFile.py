@@ -0,0 +1,239 @@
+import itertools
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from PriorityQueueFile import PriorityQueue, HeapObserver, Node, T
+
+IndexedNode = Tuple[int, T, int]
+
+
+class IndexedPriorityQueue(PriorityQueue[T]):
+    """
+    A PriorityQueue that can find any of its nodes again. add_value hands back a handle, and the handle can later be
+    used to change that node's priority or to take it out of the queue, each in O(log n) - the decrease-key and
+    delete operations that Dijkstra's algorithm and A* need.
+    Each node in my_tree is (priority, value, handle), and self._positions maps every handle to the index of its node.
+    heapify_up and heapify_down keep that map up to date as nodes move.
+    """
+
+    def __init__(self, tree: List[Node] = [], is_min_heap: bool = True, heapify: bool = False,
+                 observer: Optional[HeapObserver[T]] = None):
+        self._handles = itertools.count()
+        self._positions: Dict[int, int] = {}
+        super().__init__(tree=[], is_min_heap=is_min_heap, observer=observer)
+        self.my_tree: List[IndexedNode] = self._make_indexed_nodes(tree)
+        if heapify:
+            self.build_heap()
+
+    def _make_indexed_nodes(self, nodes: Iterable[Node]) -> List[IndexedNode]:
+        """
+        gives each (priority, value) node a new handle, recording the index it will have once appended to my_tree.
+        """
+        indexed_nodes = []
+        index = len(self.my_tree)
+        for node in nodes:
+            handle = next(self._handles)
+            self._positions[handle] = index
+            indexed_nodes.append((node[0], node[1], handle))
+            index += 1
+        return indexed_nodes
+
+    def handles(self) -> List[int]:
+        """
+        gives the handles of every node in the queue, in tree order.
+        """
+        return [node[2] for node in self.my_tree]
+
+    def __contains__(self, handle: int) -> bool:
+        return handle in self._positions
+
+    def _index_of_handle(self, handle: int) -> int:
+        if handle not in self._positions:
+            raise KeyError(f"Handle {handle} is not in this Queue.")
+        self._ensure_heap()
+        return self._positions[handle]
+
+    def priority_of(self, handle: int) -> int:
+        """
+        gives the current priority of the node with this handle.
+        raises a KeyError if the handle is not in the queue.
+        """
+        return self.my_tree[self._index_of_handle(handle)][0]
+
+    def clear(self):
+        super().clear()
+        self._positions = {}
+
+    def add_value(self, value: T, priority: int = 1) -> int:
+        """
+        adds a node to this data structure and makes sure that the my_tree data structure is
+        still a heap.
+        :param value: the value to store
+        :param priority: its relative weight
+        :return: the handle for the new node
+        """
+        handle = next(self._handles)
+        node = (priority, value, handle)
+        self._positions[handle] = len(self.my_tree)
+        self.my_tree.append(node)
+        if not self._needs_heapify:
+            self.heapify_up(len(self.my_tree) - 1)
+        if self.observer is not None:
+            self.observer.node_added(self, self._export_node(node))
+        return handle
+
+    def add_values(self, nodes: Iterable[Node], lazy: bool = False) -> List[int]:
+        """
+        adds many (priority, value) nodes at once, as in PriorityQueue.add_values.
+        :return: the handles for the new nodes, in the order they were given
+        """
+        indexed_nodes = self._make_indexed_nodes(nodes)
+        super().add_values(indexed_nodes, lazy=lazy)
+        return [node[2] for node in indexed_nodes]
+
+    def pop(self) -> Node:
+        """
+        Removes the node at the start of this Priority Queue and returns its (priority, value); its handle is no
+        longer valid.
+        """
+        if self.is_empty():
+            raise IndexError("Attempted to pop from an empty Queue.")
+        self._ensure_heap()
+        handle = self.my_tree[0][2]
+        node = super().pop()
+        del self._positions[handle]
+        return node
+
+    def _can_adopt_nodes_of(self, other: PriorityQueue[T]) -> bool:
+        return False  # the other queue's handles could clash with ours, so its nodes are always added again.
+
+    def pushpop(self, value: T, priority: int = 1) -> Node:
+        """
+        as PriorityQueue.pushpop. If the new node stays in the queue it gets a handle, but since it is not returned,
+        use add_value instead when you need one.
+        """
+        if self.my_tree:
+            self._ensure_heap()
+            if self.a_has_priority_over_b(self.my_tree[0], (priority, value)):
+                root = self.pop()
+                self.add_value(value, priority)
+                return root
+        return priority, value
+
+    def replace(self, value: T, priority: int = 1) -> Node:
+        """
+        as PriorityQueue.replace, with the same caveat about handles as pushpop.
+        """
+        if self.is_empty():
+            raise IndexError("Attempted to replace the front of an empty Queue.")
+        root = self.pop()
+        self.add_value(value, priority)
+        return root
+
+    def pop_many(self, k: int) -> List[Node]:
+        """
+        Removes the first k nodes of this Priority Queue and returns their (priority, value)s, in order; their handles
+        are no longer valid.
+        """
+        nodes = self._pop_many_stored(k)
+        for node in nodes:
+            del self._positions[node[2]]
+        return [(node[0], node[1]) for node in nodes]
+
+    def _reindex(self):
+        self._positions = {node[2]: index for index, node in enumerate(self.my_tree)}
+
+    def _export_node(self, node: IndexedNode) -> Node:
+        return node[0], node[1]
+
+    def change_priority(self, handle: int, priority: int):
+        """
+        gives the node with this handle a new priority, and moves it up or down the tree to match.
+        raises a KeyError if the handle is not in the queue.
+        :return None:
+        """
+        index = self._index_of_handle(handle)
+        old_node = self.my_tree[index]
+        new_node = (priority, old_node[1], handle)
+        self.my_tree[index] = new_node
+        if self.a_has_priority_over_b(new_node, old_node):
+            self.heapify_up(index)
+        else:
+            self.heapify_down(index)
+
+    def remove(self, handle: int) -> Node:
+        """
+        takes the node with this handle out of the queue, wherever it is, and returns its (priority, value).
+        raises a KeyError if the handle is not in the queue.
+        """
+        index = self._index_of_handle(handle)
+        tree = self.my_tree
+        node = tree[index]
+        last = tree.pop()
+        del self._positions[handle]
+        if index < len(tree):
+            tree[index] = last
+            self._positions[last[2]] = index
+            if index > 0 and self.a_has_priority_over_b(last, tree[(index - 1) >> 1]):
+                self.heapify_up(index)
+            else:
+                self.heapify_down(index)
+        return node[0], node[1]
+
+    def heapify_up(self, index: int):
+        """
+        the same as PriorityQueue.heapify_up, except that every node that moves has its position recorded.
+        """
+        tree = self.my_tree
+        if not 0 <= index < len(tree):
+            raise IndexError(f"Index {index} is out of bounds for tree of size {len(tree)}")
+        positions = self._positions
+        before = self._before
+        node = tree[index]
+        while index > 0:
+            parent_index = (index - 1) >> 1
+            parent_node = tree[parent_index]
+            if not before(node[0], parent_node[0]):
+                break
+            tree[index] = parent_node
+            positions[parent_node[2]] = index
+            index = parent_index
+        tree[index] = node
+        positions[node[2]] = index
+
+    def heapify_down(self, index: int = 0, size: Optional[int] = None):
+        """
+        the same as PriorityQueue.heapify_down, except that every node that moves has its position recorded.
+        """
+        tree = self.my_tree
+        if size is None:
+            size = len(tree)
+        if not 0 <= index < size:
+            return
+        if self.observer is not None:
+            # every node on the path from index down to where the node stopped has moved.
+            stop = self._heapify_down_traced(index, size)
+            while stop > index:
+                self._positions[self.my_tree[stop][2]] = stop
+                stop = (stop - 1) >> 1
+            self._positions[self.my_tree[index][2]] = index
+            return
+        positions = self._positions
+        before = self._before
+        node = tree[index]
+        child_index = 2 * index + 1
+        while child_index < size:
+            child = tree[child_index]
+            right_index = child_index + 1
+            if right_index < size:
+                right = tree[right_index]
+                if before(right[0], child[0]):
+                    child_index = right_index
+                    child = right
+            if not before(child[0], node[0]):
+                break
+            tree[index] = child
+            positions[child[2]] = index
+            index = child_index
+            child_index = 2 * index + 1
+        tree[index] = node
+        positions[node[2]] = index
@@ -1,18 +1,78 @@
 import logging
-from typing import Callable, Any
+import threading
+import time
+from contextvars import ContextVar
+from typing import Callable, Any, Dict, Optional
 import functools
-import traceback
 """
-Based on an example by Arjan of arjancodes.com: https://www.youtube.com/watch?v=QH5fw9kxDQA 
+Based on an example by Arjan of arjancodes.com: https://www.youtube.com/watch?v=QH5fw9kxDQA
 """
 
+# how many decorated calls are running, nested, in the current thread (or asyncio task); it sets the log indent.
+_call_depth: ContextVar[int] = ContextVar("call_depth", default=0)
+
+# for timed methods: qualified method name -> {"calls", "total_seconds", "max_seconds"}
+method_timings: Dict[str, Dict[str, float]] = {}
+_timings_lock = threading.Lock()
+
+
+def log_start_stop_method(func: Optional[Callable[..., Any]] = None, *, logger: Optional[logging.Logger] = None,
+                          level: int = logging.INFO, timed: bool = False) -> Callable[..., Any]:
+    """
+    logs each call to the decorated function as it starts and finishes, indented by how many decorated calls it is
+    nested in. Use it bare, as @log_start_stop_method, or with options, as @log_start_stop_method(timed=True).
+    Nothing is formatted unless the logger would show it; when it wouldn't, and timed is off, a call costs one
+    isEnabledFor check.
+    :param logger: where the messages go; defaults to the root logger.
+    :param level: the level to log at.
+    :param timed: if True, each call's wall-clock time is added to method_timings, whether or not it is logged.
+    """
+    if func is None:
+        return functools.partial(log_start_stop_method, logger=logger, level=level, timed=timed)
+    log = logger if logger is not None else logging.getLogger()
+    name = func.__qualname__
 
-def log_start_stop_method(func: Callable[..., Any]) -> Callable[..., Any]:
     @functools.wraps(func)
     def wrapper(*args: Any, **kwargs: Any) -> Any:
-        indent = "\t"*max(0, len(traceback.extract_stack())-1)
-        logging.info(f"{indent}Starting method {func.__name__}({args})")
-        value = func(*args, **kwargs)
-        logging.info(f"{indent}Finishing method: {func.__name__}")
-        return value
+        logging_on = log.isEnabledFor(level)
+        if not logging_on and not timed:
+            return func(*args, **kwargs)
+        depth = _call_depth.get()
+        token = _call_depth.set(depth + 1)
+        if logging_on:
+            log.log(level, "%sStarting method %s(%s)", "\t" * depth, func.__name__, args)
+        start = time.perf_counter() if timed else 0.0
+        try:
+            return func(*args, **kwargs)
+        finally:
+            if timed:
+                _record_timing(name, time.perf_counter() - start)
+            _call_depth.reset(token)
+            if logging_on:
+                log.log(level, "%sFinishing method: %s", "\t" * depth, func.__name__)
     return wrapper
+
+
+def _record_timing(name: str, seconds: float):
+    with _timings_lock:
+        timing = method_timings.get(name)
+        if timing is None:
+            method_timings[name] = {"calls": 1, "total_seconds": seconds, "max_seconds": seconds}
+        else:
+            timing["calls"] += 1
+            timing["total_seconds"] += seconds
+            if seconds > timing["max_seconds"]:
+                timing["max_seconds"] = seconds
+
+
+def timing_report(reset: bool = False) -> Dict[str, Dict[str, float]]:
+    """
+    gives a copy of method_timings, with each method's mean time added.
+    :param reset: if True, start the aggregates again from nothing afterwards.
+    """
+    with _timings_lock:
+        report = {name: dict(timing, mean_seconds=timing["total_seconds"] / timing["calls"])
+                  for name, timing in method_timings.items()}
+        if reset:
+            method_timings.clear()
+    return report
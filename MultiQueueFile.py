@@ -0,0 +1,306 @@
+import math
+import multiprocessing
+import os
+import random
+import threading
+from typing import Any, Callable, Generic, Iterable, List, Optional
+
+from PriorityQueueFile import PriorityQueue, Node, T
+"""
+A MultiQueue spreads one logical priority queue over several independent PriorityQueue "shards", each with its own
+lock, so that threads working on different shards don't wait for each other. add_value puts a node in a random shard;
+pop looks at the roots of two random shards and pops the better one. Nodes don't come out in exact priority order,
+but close to it: the node popped is, on average, only about as many places from the true front as there are shards.
+ProcessMultiQueue does the same with each shard living in its own worker process.
+"""
+
+
+class MultiQueue(Generic[T]):
+    """
+    A relaxed priority queue that any number of threads can add to and pop from, built from several PriorityQueue
+    shards. Unlike ThreadSafePriorityQueue, pop never waits: it raises an IndexError if every shard is empty.
+    """
+
+    def __init__(self, shards: Optional[int] = None, is_min_heap: bool = True,
+                 make_queue: Optional[Callable[[], PriorityQueue[T]]] = None, seed: Optional[int] = None):
+        """
+        :param shards: how many PriorityQueues to spread the nodes over; twice the number of CPUs if not given.
+        :param is_min_heap: whether lower priorities come out first.
+        :param make_queue: makes each shard; a plain PriorityQueue with is_min_heap if not given. All shards must
+        order their nodes the same way.
+        :param seed: seeds the random choice of shards, for repeatable runs.
+        """
+        if shards is None:
+            shards = 2 * (os.cpu_count() or 1)
+        if shards < 1:
+            raise ValueError(f"A MultiQueue needs at least one shard, not {shards}.")
+        if make_queue is None:
+            def make_queue():
+                return PriorityQueue(is_min_heap=is_min_heap)
+        self.is_min_heap = is_min_heap
+        self.shards: List[PriorityQueue[T]] = [make_queue() for _ in range(shards)]
+        self._locks = [threading.Lock() for _ in range(shards)]
+        # the sort key of each shard's root (None when it's empty), so that pop can compare shards without locking
+        # them.
+        self._roots: List[Optional[Any]] = [None] * shards
+        self._random = random.Random(seed)
+
+    def __len__(self):
+        return sum(len(shard) for shard in self.shards)
+
+    def is_empty(self) -> bool:
+        return all(root is None for root in self._roots)
+
+    def _lock_random_shard(self) -> int:
+        """
+        locks a random shard, trying others if the first ones we pick are busy.
+        :return: the index of the locked shard
+        """
+        randrange = self._random.randrange
+        count = len(self.shards)
+        while True:
+            index = randrange(count)
+            if self._locks[index].acquire(blocking=False):
+                return index
+
+    def add_value(self, value: T, priority: int = 1):
+        """
+        adds a node to a random shard.
+        :param value: the value to store
+        :param priority: its relative weight
+        :return None:
+        """
+        index = self._lock_random_shard()
+        try:
+            shard = self.shards[index]
+            shard.add_value(value, priority)
+            self._roots[index] = self._root_key(shard)
+        finally:
+            self._locks[index].release()
+
+    def add_values(self, nodes: Iterable[Node]):
+        """
+        adds many (priority, value) nodes, all to one random shard.
+        :return None:
+        """
+        index = self._lock_random_shard()
+        try:
+            shard = self.shards[index]
+            shard.add_values(nodes)
+            self._roots[index] = self._root_key(shard)
+        finally:
+            self._locks[index].release()
+
+    @staticmethod
+    def _root_key(shard: PriorityQueue[T]) -> Optional[Any]:
+        """
+        gives the sort key of shard's root just as the shard stores it, or None if the shard is empty. Comparing
+        stored keys with the shard's own comparison respects whatever key, stable or comparator options it has.
+        """
+        if shard.is_empty():
+            return None
+        shard._ensure_heap()
+        return shard.my_tree[0][0]
+
+    def _pick_shard(self) -> int:
+        """
+        of two randomly chosen shards, picks the one whose root has priority. Empty shards lose; if both are empty
+        we look for any shard that isn't.
+        raises an IndexError if every shard is empty.
+        """
+        roots = self._roots
+        count = len(roots)
+        first = self._random.randrange(count)
+        second = self._random.randrange(count)
+        a, b = roots[first], roots[second]
+        if a is None and b is None:
+            for index in range(count):
+                if roots[index] is not None:
+                    return index
+            raise IndexError("Attempted to pop from an empty Queue.")
+        # the comparison is looked up each time, so that it is counted once enable_stats has wrapped it.
+        if a is None or (b is not None and self.shards[0]._before(b, a)):
+            return second
+        return first
+
+    def pop(self) -> Node:
+        """
+        removes and returns the better root of two randomly chosen shards.
+        raises an IndexError if every shard is empty.
+        """
+        while True:
+            index = self._pick_shard()
+            if not self._locks[index].acquire(blocking=False):
+                continue
+            try:
+                shard = self.shards[index]
+                if shard.is_empty():  # another thread got there first.
+                    continue
+                node = shard.pop()
+                self._roots[index] = self._root_key(shard)
+                return node
+            finally:
+                self._locks[index].release()
+
+    def pop_many(self, k: int) -> List[Node]:
+        """
+        removes and returns up to k nodes, popping them one by one as pop does.
+        """
+        nodes = []
+        for _ in range(k):
+            try:
+                nodes.append(self.pop())
+            except IndexError:
+                break
+        return nodes
+
+
+def _shard_worker(connection, roots, index: int, is_min_heap: bool):
+    """
+    runs one shard of a ProcessMultiQueue: takes commands from connection until told to stop, and after each one
+    writes the shard's root priority to roots[index] (or nan when the shard is empty).
+    """
+    shard: PriorityQueue = PriorityQueue(is_min_heap=is_min_heap)
+    while True:
+        command = connection.recv()
+        name = command[0]
+        if name == "add":
+            shard.add_values(command[1])
+        elif name == "pop":
+            connection.send(shard.pop_many(command[1]))
+        elif name == "len":
+            connection.send(len(shard))
+        elif name == "stop":
+            connection.close()
+            return
+        roots[index] = math.nan if shard.is_empty() else shard.peek()[0]
+
+
+class ProcessMultiQueue(Generic[T]):
+    """
+    A MultiQueue whose shards each live in their own worker process, so the heap work on different shards runs on
+    different cores instead of taking turns holding the GIL. Every add and pop is a message to a worker, so this only
+    pays off when there is a lot of work per message - use add_values and pop_many with big batches.
+    Priorities must be numbers, and values must be picklable. Call close() (or use a with block) when done.
+    """
+
+    def __init__(self, shards: Optional[int] = None, is_min_heap: bool = True, seed: Optional[int] = None,
+                 context: Optional[str] = None):
+        """
+        :param shards: how many worker processes to start; one per CPU if not given.
+        :param is_min_heap: whether lower priorities come out first.
+        :param seed: seeds the random choice of shards, for repeatable runs.
+        :param context: the multiprocessing start method, e.g. "spawn"; the platform's default if not given.
+        """
+        if shards is None:
+            shards = os.cpu_count() or 1
+        if shards < 1:
+            raise ValueError(f"A ProcessMultiQueue needs at least one shard, not {shards}.")
+        multiprocessing_context = multiprocessing.get_context(context)
+        self.is_min_heap = is_min_heap
+        self._before = PriorityQueue(is_min_heap=is_min_heap)._before
+        # each worker keeps its root priority here, in shared memory, so pop can compare shards without asking them.
+        self._roots = multiprocessing_context.Array("d", [math.nan] * shards, lock=False)
+        self._connections = []
+        self._workers = []
+        for index in range(shards):
+            connection, worker_connection = multiprocessing_context.Pipe()
+            worker = multiprocessing_context.Process(target=_shard_worker, daemon=True,
+                                                     args=(worker_connection, self._roots, index, is_min_heap))
+            worker.start()
+            worker_connection.close()
+            self._connections.append(connection)
+            self._workers.append(worker)
+        self._locks = [threading.Lock() for _ in range(shards)]
+        self._random = random.Random(seed)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """
+        stops the worker processes; everything still in the queue is lost.
+        """
+        for index, connection in enumerate(self._connections):
+            with self._locks[index]:
+                if not connection.closed:
+                    connection.send(("stop",))
+                    connection.close()
+        for worker in self._workers:
+            worker.join()
+
+    def __len__(self):
+        total = 0
+        for index, connection in enumerate(self._connections):
+            with self._locks[index]:
+                connection.send(("len",))
+                total += connection.recv()
+        return total
+
+    def is_empty(self) -> bool:
+        return len(self) == 0
+
+    def add_value(self, value: T, priority: int = 1):
+        """
+        adds a node to a random shard.
+        """
+        self.add_values([(priority, value)])
+
+    def add_values(self, nodes: Iterable[Node]):
+        """
+        adds many (priority, value) nodes, all to one random shard, in a single message.
+        """
+        index = self._random.randrange(len(self._connections))
+        with self._locks[index]:
+            self._connections[index].send(("add", list(nodes)))
+
+    def _pick_shard(self) -> Optional[int]:
+        """
+        of two randomly chosen shards, picks the one whose root has priority, as MultiQueue._pick_shard does.
+        :return: the shard's index, or None if every shard looks empty
+        """
+        roots = self._roots
+        count = len(roots)
+        first = self._random.randrange(count)
+        second = self._random.randrange(count)
+        a, b = roots[first], roots[second]
+        if math.isnan(a) and math.isnan(b):
+            for index in range(count):
+                if not math.isnan(roots[index]):
+                    return index
+            return None
+        if math.isnan(a) or (not math.isnan(b) and self._before(b, a)):
+            return second
+        return first
+
+    def pop_many(self, k: int) -> List[Node]:
+        """
+        removes and returns up to k nodes, in order, from the better of two randomly chosen shards. Fewer than k come
+        back if that shard runs out.
+        """
+        while True:
+            index = self._pick_shard()
+            if index is None:
+                # a shard's root is only written after it has handled its messages, so check the lengths too.
+                if self.is_empty():
+                    return []
+                index = self._random.randrange(len(self._connections))
+            with self._locks[index]:
+                connection = self._connections[index]
+                connection.send(("pop", k))
+                nodes = connection.recv()
+            if nodes:
+                return nodes
+
+    def pop(self) -> Node:
+        """
+        removes and returns the better root of two randomly chosen shards.
+        raises an IndexError if every shard is empty.
+        """
+        nodes = self.pop_many(1)
+        if not nodes:
+            raise IndexError("Attempted to pop from an empty Queue.")
+        return nodes[0]
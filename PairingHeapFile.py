@@ -0,0 +1,131 @@
+import operator
+from typing import Any, Callable, Generic, Iterable, List, Optional
+
+from PriorityQueueFile import Node, T
+
+
+class PairingNode(Generic[T]):
+    """
+    One node of a PairingHeap: a priority and value, plus the subheaps hanging below it.
+    """
+    __slots__ = ("priority", "value", "children")
+
+    def __init__(self, priority: int, value: T):
+        self.priority = priority
+        self.value = value
+        self.children: List["PairingNode[T]"] = []
+
+
+class PairingHeap(Generic[T]):
+    """
+    A priority queue kept as a tree of PairingNodes instead of an array. It offers the same add_value/peek/pop as
+    PriorityQueue, but two PairingHeaps can be melded in O(1): the root with less priority just becomes a child of the
+    other root. add_value is O(1) too (it is a meld with a one-node heap); pop is O(log n) amortized, and is where the
+    work of tidying up the tree gets done.
+    """
+
+    def __init__(self, tree: Iterable[Node] = (), is_min_heap: bool = True,
+                 comparator: Optional[Callable[[Any, Any], bool]] = None):
+        """
+        :param tree: (priority, value) nodes to start with.
+        :param is_min_heap: whether lower priorities come out first.
+        :param comparator: if given, comparator(a, b) decides whether priority a has priority over priority b, and
+        is_min_heap is ignored. It must be False when a and b are equal.
+        """
+        self.is_min_heap = is_min_heap
+        if comparator is None:
+            self._before: Callable[[Any, Any], bool] = operator.lt if is_min_heap else operator.gt
+        else:
+            self._before = comparator
+        self.root: Optional[PairingNode[T]] = None
+        self.size = 0
+        self.add_values(tree)
+
+    def __len__(self):
+        return self.size
+
+    def is_empty(self) -> bool:
+        return self.root is None
+
+    def clear(self):
+        """
+        removes all items from this priority queue.
+        :return None:
+        """
+        self.root = None
+        self.size = 0
+
+    def _link(self, a: PairingNode[T], b: PairingNode[T]) -> PairingNode[T]:
+        """
+        joins two subheaps by making the root with less priority a child of the other; a tie leaves a on top.
+        :return: the root of the joined subheap
+        """
+        if self._before(b.priority, a.priority):
+            a, b = b, a
+        a.children.append(b)
+        return a
+
+    def add_value(self, value: T, priority: int = 1):
+        """
+        adds a node to this heap in O(1).
+        :param value: the value to store
+        :param priority: its relative weight
+        :return None:
+        """
+        node = PairingNode(priority, value)
+        self.root = node if self.root is None else self._link(self.root, node)
+        self.size += 1
+
+    def add_values(self, nodes: Iterable[Node]):
+        """
+        adds many (priority, value) nodes.
+        :return None:
+        """
+        for node in nodes:
+            self.add_value(node[1], node[0])
+
+    def meld(self, other: "PairingHeap[T]"):
+        """
+        moves every node of other into this heap in O(1), leaving other empty. Both heaps must order their nodes the
+        same way.
+        """
+        if other is self:
+            raise ValueError("A PairingHeap cannot be melded with itself.")
+        if other.root is not None:
+            self.root = other.root if self.root is None else self._link(self.root, other.root)
+            self.size += other.size
+        other.clear()
+
+    def peek(self) -> Node:
+        """
+        Gives the node at the start of this heap without removing it.
+        """
+        if self.root is None:
+            raise IndexError("Attempted to peek at an empty Queue.")
+        return self.root.priority, self.root.value
+
+    def pop(self) -> Node:
+        """
+        Removes the node at the start of this heap and returns it. The root's children are paired up left to right,
+        and the pairs are then folded together right to left into the new root; this two-pass pairing is what keeps
+        pops O(log n) amortized.
+        """
+        root = self.root
+        if root is None:
+            raise IndexError("Attempted to pop from an empty Queue.")
+        children = root.children
+        link = self._link
+        pairs = [link(children[i], children[i + 1]) if i + 1 < len(children) else children[i]
+                 for i in range(0, len(children), 2)]
+        new_root = pairs.pop() if pairs else None
+        while pairs:
+            new_root = link(pairs.pop(), new_root)
+        self.root = new_root
+        self.size -= 1
+        return root.priority, root.value
+
+    def pop_many(self, k: int) -> List[Node]:
+        """
+        Removes the first k nodes of this heap (or all of them, if there are fewer than k) and returns them in order.
+        """
+        return [self.pop() for _ in range(min(k, self.size))]
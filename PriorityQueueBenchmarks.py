@@ -0,0 +1,497 @@
+import argparse
+import bisect
+import heapq
+import json
+import logging
+import os
+import platform
+import random
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from CompactPriorityQueueFile import CompactPriorityQueue
+from ConcurrentPriorityQueueFile import ThreadSafePriorityQueue
+from DurablePriorityQueueFile import DurablePriorityQueue
+from MultiQueueFile import MultiQueue, ProcessMultiQueue
+from PairingHeapFile import PairingHeap
+from PriorityQueueFile import PriorityQueue, LoggingObserver, Node
+from TimerSchedulerFile import TimerScheduler
+"""
+Timing experiments for PriorityQueue. Run this file directly to print the results; each benchmark_... function can
+also be called on its own with a different size.
+Run it with --suite to time every engine on every workload, size and priority distribution instead, and print (or,
+with --output, save) the results as JSON for comparing runs, e.g.
+    python PriorityQueueBenchmarks.py --suite --sizes 1000 100000 --output results.json
+"""
+
+
+def random_priorities(n: int, seed: int = 0) -> List[int]:
+    """
+    makes a repeatable list of n random priorities.
+    """
+    rng = random.Random(seed)
+    return [rng.randrange(n * 4) for _ in range(n)]
+
+
+def time_add_pop(make_queue: Callable[[], PriorityQueue], priorities: List[int]) -> Dict[str, float]:
+    """
+    adds every priority to a fresh queue, then pops them all, timing each half.
+    :return: operations per second for the adds and for the pops
+    """
+    pq = make_queue()
+    start = time.perf_counter()
+    for i, priority in enumerate(priorities):
+        pq.add_value(i, priority)
+    middle = time.perf_counter()
+    while not pq.is_empty():
+        pq.pop()
+    end = time.perf_counter()
+    return {"add_per_sec": len(priorities) / (middle - start), "pop_per_sec": len(priorities) / (end - middle)}
+
+
+def benchmark_tracing(n: int = 2_000) -> Dict[str, Dict[str, float]]:
+    """
+    compares add/pop throughput with the old always-on tracing (LoggingObserver, with its output thrown away) against
+    the default, untraced queue.
+    """
+    priorities = random_priorities(n)
+    quiet_logger = logging.getLogger("PriorityQueueBenchmarks.tracing")
+    quiet_logger.addHandler(logging.NullHandler())
+    quiet_logger.setLevel(logging.INFO)
+    quiet_logger.propagate = False
+    with open(os.devnull, "w") as devnull:
+        traced = time_add_pop(lambda: PriorityQueue(observer=LoggingObserver(quiet_logger, devnull)), priorities)
+    untraced = time_add_pop(lambda: PriorityQueue(), priorities)
+    return {"tracing on": traced, "tracing off": untraced}
+
+
+def benchmark_arity(n: int = 100_000, arities: Tuple[int, ...] = (2, 3, 4, 8)) -> Dict[str, Dict[str, float]]:
+    """
+    compares add/pop throughput for heaps with different numbers of children per node.
+    """
+    priorities = random_priorities(n)
+    return {f"arity {arity}": time_add_pop(lambda: PriorityQueue(arity=arity), priorities) for arity in arities}
+
+
+def memory_per_node(make_queue: Callable[[], PriorityQueue], priorities: List[int]) -> float:
+    """
+    measures how many bytes a queue allocates for each node it holds, not counting the values themselves.
+    """
+    values = list(range(len(priorities)))  # made before tracing starts, so both queues share them.
+    tracemalloc.start()
+    pq = make_queue()
+    for priority, value in zip(priorities, values):
+        pq.add_value(value, priority)
+    used, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return used / len(priorities)
+
+
+def benchmark_storage(n: int = 100_000) -> Dict[str, Dict[str, float]]:
+    """
+    compares the list-of-tuples PriorityQueue with the array-backed CompactPriorityQueue, for memory and speed.
+    """
+    priorities = random_priorities(n)
+    results = {}
+    for name, make_queue in [("tuple list", lambda: PriorityQueue()),
+                             ("array('q')", lambda: CompactPriorityQueue(typecode="q"))]:
+        results[name] = {"bytes_per_node": memory_per_node(make_queue, priorities)}
+        results[name].update(time_add_pop(make_queue, priorities))
+    return results
+
+
+def benchmark_stability(n: int = 100_000) -> Dict[str, Dict[str, float]]:
+    """
+    compares add/pop throughput of an ordinary queue with a stable (first in, first out on ties) one, on priorities
+    with many duplicates.
+    """
+    priorities = [priority % 100 for priority in random_priorities(n)]
+    return {"unstable": time_add_pop(lambda: PriorityQueue(), priorities),
+            "stable": time_add_pop(lambda: PriorityQueue(stable=True), priorities)}
+
+
+def benchmark_engines(n: int = 100_000, events_per_tick: int = 10, horizon: int = 100) -> Dict[str, Dict[str, float]]:
+    """
+    compares the heap and bucket engines on an event simulation: starting from n events, each pop schedules a new
+    event up to horizon ticks later, so there are always about n pending and every tick holds about events_per_tick.
+    """
+    rng = random.Random(0)
+    delays = [rng.randrange(1, horizon + 1) for _ in range(n)]
+    start_ticks = [rng.randrange(n // events_per_tick) for _ in range(n)]
+    results = {}
+    for engine in ("heap", "bucket"):
+        pq = PriorityQueue(engine=engine)
+        start = time.perf_counter()
+        for i, tick in enumerate(start_ticks):
+            pq.add_value(i, tick)
+        for delay in delays:
+            tick, value = pq.pop()
+            pq.add_value(value, tick + delay)
+        results[engine] = {"ops_per_sec": 3 * n / (time.perf_counter() - start)}
+    return results
+
+
+def benchmark_durability(n: int = 20_000, group_size: int = 64) -> Dict[str, Dict[str, float]]:
+    """
+    compares add/pop throughput of a plain queue with a DurablePriorityQueue that fsyncs every record, one that
+    fsyncs every group_size records, and one that never fsyncs. The logs go in a temporary directory.
+    """
+    priorities = random_priorities(n)
+    results = {"not durable": time_add_pop(lambda: PriorityQueue(), priorities)}
+    for name, options in [("fsync always", {"group_size": 1}),
+                          (f"fsync every {group_size}", {"group_size": group_size}),
+                          ("fsync never", {"group_size": group_size, "fsync": False})]:
+        with tempfile.TemporaryDirectory() as directory:
+            with DurablePriorityQueue(directory, **options) as pq:
+                results[name] = time_add_pop(lambda: pq, priorities)
+    return results
+
+
+def benchmark_timers(n: int = 1_000_000, cancel_rate: float = 0.9, steps: int = 6_000,
+                     step: float = 0.01) -> Dict[str, Dict[str, float]]:
+    """
+    compares a TimerScheduler with and without a timing wheel, as in a network server: every step, n / steps timers
+    are scheduled up to 30 seconds ahead, cancel_rate of the ones from the step before are cancelled, and
+    expire_until runs everything due.
+    """
+    rng = random.Random(0)
+    per_step = n // steps
+    delays = [rng.uniform(step, 30.0) for _ in range(per_step * steps)]
+    cancels = [rng.random() < cancel_rate for _ in range(per_step * steps)]
+    results = {}
+    for name, options in [("heap", {}), ("wheel, 1ms ticks", {"wheel_tick": 0.001})]:
+        scheduler = TimerScheduler(**options)
+        fired = []
+        previous = []
+        start = time.perf_counter()
+        for i in range(steps):
+            now = i * step
+            timers = [scheduler.schedule(now + delay, fired.append, None)
+                      for delay in delays[i * per_step:(i + 1) * per_step]]
+            for timer, cancel in zip(previous, cancels[(i - 1) * per_step:i * per_step]):
+                if cancel:
+                    scheduler.cancel(timer)
+            previous = timers
+            scheduler.expire_until(now)
+        scheduler.expire_until(steps * step + 30.0)
+        results[name] = {"timers_per_sec": per_step * steps / (time.perf_counter() - start),
+                         "fired": len(fired)}
+    return results
+
+
+def benchmark_threads(n: int = 100_000, thread_counts: Tuple[int, ...] = (1, 2, 4, 8),
+                      batch_size: int = 1) -> Dict[str, Dict[str, float]]:
+    """
+    measures ThreadSafePriorityQueue throughput with the same number of producer and consumer threads. Producers put
+    n nodes between them; consumers pop batch_size nodes at a time until each gets a stop marker.
+    """
+    priorities = random_priorities(n)
+    results = {}
+    for threads in thread_counts:
+        pq: ThreadSafePriorityQueue[int] = ThreadSafePriorityQueue()
+
+        def produce(start: int):
+            for i in range(start, n, threads):
+                pq.put(i, priorities[i])
+
+        def consume():
+            while True:
+                nodes = pq.pop_many(batch_size) if batch_size > 1 else [pq.pop()]
+                stops = sum(node[1] is None for node in nodes)
+                if stops:
+                    for _ in range(stops - 1):  # leave the other consumers their stop markers.
+                        pq.put(None, n * 4)
+                    return
+
+        workers = [threading.Thread(target=produce, args=(i,)) for i in range(threads)]
+        workers += [threading.Thread(target=consume) for _ in range(threads)]
+        start = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        for worker in workers[:threads]:
+            worker.join()
+        for _ in range(threads):
+            pq.put(None, n * 4)  # sorts after every real node
+        for worker in workers[threads:]:
+            worker.join()
+        results[f"{threads} x {threads} threads"] = {"items_per_sec": n / (time.perf_counter() - start)}
+    return results
+
+
+def rank_errors(popped: List[int]) -> Dict[str, float]:
+    """
+    for a min queue that was filled with distinct priorities and then popped dry, works out how many better
+    priorities were still in the queue at each pop.
+    :return: the mean and largest of those rank errors
+    """
+    remaining = sorted(popped)
+    total = 0
+    largest = 0
+    for priority in popped:
+        rank = bisect.bisect_left(remaining, priority)
+        del remaining[rank]
+        total += rank
+        largest = max(largest, rank)
+    return {"mean_rank_error": total / len(popped), "max_rank_error": largest}
+
+
+def benchmark_multiqueue(n: int = 100_000, thread_counts: Tuple[int, ...] = (1, 2, 4, 8),
+                         shards_per_thread: int = 2) -> Dict[str, Dict[str, float]]:
+    """
+    compares the exact ThreadSafePriorityQueue with a MultiQueue of shards_per_thread shards per thread: each thread
+    adds its share of n nodes and then pops that many again. Rank error is measured separately, by filling each queue
+    from one thread and popping it dry.
+    """
+    priorities = random.Random(0).sample(range(n * 4), n)
+    results = {}
+    for threads in thread_counts:
+        for name, make_queue in [("exact", lambda: ThreadSafePriorityQueue()),
+                                 ("multiqueue", lambda: MultiQueue(shards=shards_per_thread * threads, seed=0))]:
+            pq = make_queue()
+            add = pq.put if name == "exact" else pq.add_value
+
+            def work(start: int):
+                for i in range(start, n, threads):
+                    add(i, priorities[i])
+                for _ in range(start, n, threads):
+                    while True:
+                        try:
+                            pq.pop()
+                            break
+                        except IndexError:  # a MultiQueue doesn't wait when the other threads emptied it.
+                            pass
+
+            workers = [threading.Thread(target=work, args=(i,)) for i in range(threads)]
+            start = time.perf_counter()
+            for worker in workers:
+                worker.start()
+            for worker in workers:
+                worker.join()
+            rates = {"ops_per_sec": 2 * n / (time.perf_counter() - start)}
+            pq = make_queue()
+            add = pq.put if name == "exact" else pq.add_value
+            for i, priority in enumerate(priorities):
+                add(i, priority)
+            rates.update(rank_errors([pq.pop()[0] for _ in range(n)]))
+            results[f"{name}, {threads} threads"] = rates
+    return results
+
+
+def benchmark_process_multiqueue(n: int = 100_000, shard_counts: Tuple[int, ...] = (1, 2, 4),
+                                 batch_size: int = 1_000) -> Dict[str, Dict[str, float]]:
+    """
+    measures a ProcessMultiQueue that is sent n nodes and then popped dry, batch_size nodes per message each way.
+    """
+    priorities = random.Random(0).sample(range(n * 4), n)
+    nodes = [(priority, i) for i, priority in enumerate(priorities)]
+    results = {}
+    for shards in shard_counts:
+        with ProcessMultiQueue(shards=shards, seed=0) as pq:
+            start = time.perf_counter()
+            for i in range(0, n, batch_size):
+                pq.add_values(nodes[i:i + batch_size])
+            popped = []
+            while len(popped) < n:
+                popped.extend(node[0] for node in pq.pop_many(batch_size))
+            rates = {"ops_per_sec": 2 * n / (time.perf_counter() - start)}
+        rates.update(rank_errors(popped))
+        results[f"{shards} processes"] = rates
+    return results
+
+
+class HeapqQueue:
+    """
+    heapq on a plain list, behind the add_value/pop/peek methods the suite calls, as a yardstick.
+    """
+
+    def __init__(self, tree: Sequence[Node] = (), heapify: bool = False):
+        self.my_tree = list(tree)
+        if heapify:
+            heapq.heapify(self.my_tree)
+
+    def is_empty(self) -> bool:
+        return not self.my_tree
+
+    def add_value(self, value, priority: int = 1):
+        heapq.heappush(self.my_tree, (priority, value))
+
+    def peek(self) -> Node:
+        return self.my_tree[0]
+
+    def pop(self) -> Node:
+        return heapq.heappop(self.my_tree)
+
+
+# each engine makes a min queue from a list of (priority, value) nodes, heapifying them.
+SUITE_ENGINES: Dict[str, Callable[[List[Node]], Any]] = {
+    "heapq": lambda nodes: HeapqQueue(nodes, heapify=True),
+    "PriorityQueue": lambda nodes: PriorityQueue(nodes, heapify=True),
+    "PriorityQueue(arity=4)": lambda nodes: PriorityQueue(nodes, heapify=True, arity=4),
+    "PriorityQueue(stable=True)": lambda nodes: PriorityQueue(nodes, heapify=True, stable=True),
+    "CompactPriorityQueue": lambda nodes: CompactPriorityQueue(nodes, heapify=True),
+    "PairingHeap": lambda nodes: PairingHeap(nodes),
+    "BucketQueue": lambda nodes: PriorityQueue(nodes, engine="bucket"),
+}
+
+# each distribution makes n repeatable priorities from a seeded random.Random.
+SUITE_DISTRIBUTIONS: Dict[str, Callable[[int, random.Random], List[int]]] = {
+    "uniform": lambda n, rng: [rng.randrange(n * 4) for _ in range(n)],
+    "sorted": lambda n, rng: sorted(rng.randrange(n * 4) for _ in range(n)),
+    "reverse_sorted": lambda n, rng: sorted((rng.randrange(n * 4) for _ in range(n)), reverse=True),
+    "duplicates": lambda n, rng: [rng.randrange(10) for _ in range(n)],
+}
+
+
+def _workload_push_heavy(make_queue, nodes: List[Node]) -> int:
+    """
+    adds every node to an empty queue, then pops a tenth of them.
+    """
+    pq = make_queue([])
+    for priority, value in nodes:
+        pq.add_value(value, priority)
+    for _ in range(len(nodes) // 10):
+        pq.pop()
+    return len(nodes) + len(nodes) // 10
+
+
+def _workload_pop_heavy(pq, nodes: List[Node]) -> int:
+    """
+    pops a queue holding every node dry.
+    """
+    for _ in range(len(nodes)):
+        pq.pop()
+    return len(nodes)
+
+
+def _workload_mixed(make_queue, nodes: List[Node]) -> int:
+    """
+    starting from half the nodes, adds the other half one at a time with a pop after each.
+    """
+    half = len(nodes) // 2
+    pq = make_queue(nodes[:half])
+    for priority, value in nodes[half:]:
+        pq.add_value(value, priority)
+        pq.pop()
+    return 2 * (len(nodes) - half)
+
+
+def _workload_peek(pq, nodes: List[Node]) -> int:
+    for _ in range(len(nodes)):
+        pq.peek()
+    return len(nodes)
+
+
+def _workload_heapify(make_queue, nodes: List[Node]) -> int:
+    make_queue(nodes)
+    return len(nodes)
+
+
+def _workload_is_a_heap(pq, nodes: List[Node]) -> int:
+    if not hasattr(pq, "is_a_heap"):
+        raise TypeError(f"{type(pq).__name__} has no is_a_heap.")
+    pq.is_a_heap()
+    return len(nodes)
+
+
+# each workload is (whether making the queue is part of the timing, what to time). The timed function is handed
+# make_queue if so, or else the queue already made from every node, and returns how many operations (for heapify and
+# is_a_heap, nodes) it got through.
+SUITE_WORKLOADS: Dict[str, Tuple[bool, Callable[[Any, List[Node]], int]]] = {
+    "push_heavy": (True, _workload_push_heavy),
+    "pop_heavy": (False, _workload_pop_heavy),
+    "mixed": (True, _workload_mixed),
+    "peek": (False, _workload_peek),
+    "heapify": (True, _workload_heapify),
+    "is_a_heap": (False, _workload_is_a_heap),
+}
+
+
+def run_suite(sizes: Sequence[int] = (1_000, 10_000, 100_000), engines: Optional[Sequence[str]] = None,
+              distributions: Optional[Sequence[str]] = None, workloads: Optional[Sequence[str]] = None,
+              repeats: int = 3, seed: int = 0) -> Dict[str, Any]:
+    """
+    times every engine on every workload, for every size and distribution. Each timing is the best of repeats runs,
+    all on the same seeded priorities. A combination an engine can't do (a BucketQueue given a priority lower than one
+    it already popped, or is_a_heap on an engine without one) gets an error instead of a time.
+    :return: a JSON-ready dict of what was run, and where, and one result per combination
+    """
+    engines = list(engines or SUITE_ENGINES)
+    distributions = list(distributions or SUITE_DISTRIBUTIONS)
+    workloads = list(workloads or SUITE_WORKLOADS)
+    results = []
+    for n in sizes:
+        for distribution in distributions:
+            priorities = SUITE_DISTRIBUTIONS[distribution](n, random.Random(seed))
+            nodes = [(priority, i) for i, priority in enumerate(priorities)]
+            for engine in engines:
+                make_queue = SUITE_ENGINES[engine]
+                for workload in workloads:
+                    timed_setup, run = SUITE_WORKLOADS[workload]
+                    result = {"engine": engine, "distribution": distribution, "workload": workload, "n": n}
+                    try:
+                        best = None
+                        for _ in range(repeats):
+                            target = make_queue if timed_setup else make_queue(nodes)
+                            start = time.perf_counter()
+                            operations = run(target, nodes)
+                            elapsed = time.perf_counter() - start
+                            best = elapsed if best is None else min(best, elapsed)
+                        result.update(seconds=best, operations=operations, ops_per_sec=operations / best)
+                    except (TypeError, ValueError) as error:
+                        result["error"] = f"{type(error).__name__}: {error}"
+                    results.append(result)
+    return {"python": platform.python_version(), "implementation": platform.python_implementation(),
+            "machine": platform.machine(), "seed": seed, "repeats": repeats, "results": results}
+
+
+def print_results(title: str, results: Dict[str, Dict[str, float]]):
+    print(title)
+    for name, rates in results.items():
+        print(f"\t{name:<24}" + "".join(f"{key} = {rate:>12,.1f}\t" for key, rate in rates.items()))
+
+
+def print_all():
+    print_results("Tracing (n = 2,000):", benchmark_tracing())
+    print_results("Arity (n = 100,000):", benchmark_arity())
+    print_results("Storage (n = 100,000):", benchmark_storage())
+    print_results("Stability (n = 100,000, 100 distinct priorities):", benchmark_stability())
+    print_results("Event simulation, ~10 events per tick (n = 100,000):", benchmark_engines())
+    print_results("Write-ahead log (n = 20,000):", benchmark_durability())
+    print_results("Timers, 90% cancelled (n = 1,000,000):", benchmark_timers())
+    print_results("Producers x consumers (n = 100,000):", benchmark_threads())
+    print_results("Producers x consumers, popping 64 at a time (n = 100,000):", benchmark_threads(batch_size=64))
+    print_results("Exact queue vs MultiQueue, 2 shards per thread (n = 100,000):", benchmark_multiqueue())
+    print_results("ProcessMultiQueue, 1,000 nodes per message (n = 100,000):", benchmark_process_multiqueue())
+
+
+def main(arguments: Optional[Sequence[str]] = None):
+    parser = argparse.ArgumentParser(description="Time PriorityQueue and its engines.")
+    parser.add_argument("--suite", action="store_true", help="run the JSON benchmark suite instead")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000],
+                        help="queue sizes for the suite (up to 10,000,000 is practical)")
+    parser.add_argument("--engines", nargs="+", choices=list(SUITE_ENGINES))
+    parser.add_argument("--distributions", nargs="+", choices=list(SUITE_DISTRIBUTIONS))
+    parser.add_argument("--workloads", nargs="+", choices=list(SUITE_WORKLOADS))
+    parser.add_argument("--repeats", type=int, default=3, help="runs per timing; the best is kept")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="where to write the suite's JSON; printed if not given")
+    options = parser.parse_args(arguments)
+    if not options.suite:
+        print_all()
+        return
+    report = run_suite(options.sizes, options.engines, options.distributions, options.workloads, options.repeats,
+                       options.seed)
+    if options.output is None:
+        json.dump(report, sys.stdout, indent=1)
+        print()
+    else:
+        with open(options.output, "w") as file:
+            json.dump(report, file, indent=1)
+
+
+if __name__ == "__main__":
+    main()
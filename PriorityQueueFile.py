@@ -1,6 +1,17 @@
-import math
-from typing import List, TypeVar, Generic, Tuple
+import itertools
+import random
+from typing import List, TypeVar, Generic, Tuple, Optional, Iterable, TextIO, Sequence, Iterator, Callable, Any, Dict
 import logging
+import mmap
+import operator
+import os
+import pickle
+import struct
+import sys
+import time
+from array import array
+
+from QueueStatsFile import QueueStats, CountingList, TIMED_OPERATIONS, SIFTS
 
 T = TypeVar("T")
 
@@ -10,14 +21,162 @@ logging.basicConfig(level=logging.INFO)  # simple version to the output console
 #                     datefmt="%H:%M:%S %p --- ")  # more robust, sent to a file cNode = Tuple[int, T]
 Node = Tuple[int, T]
 
+# in a stable queue, an int priority and the node's sequence number are packed into one int, with the sequence number
+# in this many low bits.
+SEQUENCE_BITS = 48
+
+# the colors to_color_string and iter_tree_lines draw nodes in, and the code that goes back to the normal color.
+COLOR_STARTERS = ["\u001b[31m", "\u001b[32m", "\u001b[33m", "\u001b[34m", "\u001b[35m", "\u001b[36m"]
+COLOR_RESET = "\u001b[0m"
+
+# save() files start with this header: magic, format version, is_min_heap, priority typecode, arity, whether there
+# are sequence numbers, node count. Then come the node count's priorities as 8-byte little-endian numbers, then (from
+# a stable queue) their 8-byte sequence numbers, then count + 1 8-byte offsets into the payload table, then the
+# payload table itself: each value pickled, one after another.
+SNAPSHOT_MAGIC = b"PQSNAP\x00\x00"
+SNAPSHOT_VERSION = 1
+SNAPSHOT_HEADER = struct.Struct("<8sBBcBB3xQ")
+
+
+class HeapObserver(Generic[T]):
+    """
+    Gets told what a PriorityQueue is doing, for tracing and debugging. Every method here does nothing, so a subclass
+    only needs to override the events it cares about. A queue whose observer is None skips all of these calls.
+    """
+
+    def node_added(self, queue: "PriorityQueue[T]", node: Node):
+        """
+        called after node has been added to queue and the heap has been repaired.
+        """
+        pass
+
+    def node_popped(self, queue: "PriorityQueue[T]", node: Node):
+        """
+        called after node has been removed from the front of queue and the heap has been repaired.
+        """
+        pass
+
+    def sifting_down(self, queue: "PriorityQueue[T]", index: int):
+        """
+        called at each level heapify_down takes a node through, once the node has been put at index - from where it
+        starts to where it stops.
+        """
+        pass
+
+
+class LoggingObserver(HeapObserver[T]):
+    """
+    The original, very chatty diagnostics: logs every add and pop along with a drawing of the whole tree, and prints
+    the tree with the current node colored at each step of heapify_down. Each of these costs O(n).
+    """
+
+    def __init__(self, logger: Optional[logging.Logger] = None, stream: Optional[TextIO] = None):
+        """
+        :param logger: where the add/pop messages go; defaults to the root logger.
+        :param stream: where the heapify_down drawings go; defaults to sys.stdout.
+        """
+        self.logger = logger if logger is not None else logging.getLogger()
+        self.stream = stream
+
+    def node_added(self, queue: "PriorityQueue[T]", node: Node):
+        self.logger.info("-" * 128)
+        self.logger.info(f"Adding: [priority = {node[0]!r}, value = {node[1]!r}]")
+        self.logger.info(queue)
+
+    def node_popped(self, queue: "PriorityQueue[T]", node: Node):
+        self.logger.info("*" * 128)
+        self.logger.info(f"Just popped {node}")
+        self.logger.info(queue)
+
+    def sifting_down(self, queue: "PriorityQueue[T]", index: int):
+        print(queue.to_color_string([index]), file=self.stream if self.stream is not None else sys.stdout)
+
+
+# the observer given to every new PriorityQueue that isn't handed one of its own. Set this to LoggingObserver() to
+# trace everything; leave it as None for the fast, silent path.
+default_observer: Optional[HeapObserver] = None
+
 
 class PriorityQueue(Generic[T]):
 
-    def __init__(self, tree: List[Node] = [], is_min_heap: bool = True):
-        self.my_tree: List[Node] = []
-        for n in tree:
-            self.my_tree.append(n)
+    def __new__(cls, *args, engine: str = "heap", **kwargs):
+        """
+        picks the data structure behind the queue. The default "heap" engine is this class; engine="bucket" gives a
+        BucketQueue instead, which takes the tree, is_min_heap and heapify arguments.
+        """
+        if engine == "heap":
+            return super().__new__(cls)
+        if cls is not PriorityQueue:
+            raise ValueError(f"{cls.__name__} only has the 'heap' engine.")
+        if engine == "bucket":
+            from BucketQueueFile import BucketQueue
+            return BucketQueue(*args, **kwargs)
+        raise ValueError(f"Unknown PriorityQueue engine {engine!r}; use 'heap' or 'bucket'.")
+
+    def __init__(self, tree: List[Node] = [], is_min_heap: bool = True, heapify: bool = False,
+                 observer: Optional[HeapObserver[T]] = None, arity: int = 2, max_size: Optional[int] = None,
+                 stable: bool = False, key: Optional[Callable[[Any], Any]] = None,
+                 comparator: Optional[Callable[[Any, Any], bool]] = None, lazy_deletion: bool = False,
+                 compaction_ratio: float = 0.5, engine: str = "heap"):
+        """
+        :param tree: nodes to start with. They are stored exactly as given unless heapify is set.
+        :param is_min_heap: whether lower priorities come out first.
+        :param heapify: if True, the starting nodes are rearranged into a heap in O(n).
+        :param observer: gets told about adds, pops and heapify_down steps; defaults to the module's default_observer.
+        Set self.observer to None to turn tracing off for this queue.
+        :param arity: how many children each node has. The default of 2 is a binary heap; 4 or 8 make a shallower
+        tree, so pops compare more children per level but go through fewer levels and touch less memory.
+        :param max_size: if given, the queue never holds more than this many nodes. Once it is full, each add keeps
+        the new node only if it would come out _after_ the current front of the queue, and then the front is evicted.
+        So a min heap of scores with max_size=N keeps the N highest scores seen.
+        :param stable: if True, nodes with equal priority come out in the order they were added (first in, first out).
+        Each node then gets a sequence number, packed with its priority into a single int "sort key" so that ties
+        cost nothing extra to compare; priorities must be ints. my_tree then holds (sort key, value, priority) nodes,
+        but every method that hands nodes back still gives (priority, value).
+        :param key: if given, nodes are ordered by key(priority) instead of by the priority itself - for example
+        key=lambda job: (job.deadline, -job.weight). The key is worked out once, when a node is added, and kept in
+        my_tree as the node's sort key, just like in a stable queue.
+        :param comparator: if given, comparator(a, b) decides whether sort key a has priority over sort key b, and
+        is_min_heap is ignored. It must be False when a and b are equal.
+        :param lazy_deletion: if True, discard(value) can cancel queued nodes in O(1). The node is only marked dead
+        (a "tombstone"); peek and pop skip past dead nodes as they reach the front. Values must be hashable.
+        :param compaction_ratio: in a lazy_deletion queue, once more than this fraction of my_tree is dead, all the
+        dead nodes are swept out and the heap is rebuilt in O(n).
+        :param engine: "heap" for this class, or "bucket" for a BucketQueue: O(1) amortized adds and pops for int
+        priorities in a small range that only ever move one way, as event-simulation ticks do (see __new__).
+        """
+        if arity < 2:
+            raise ValueError(f"A heap needs an arity of at least 2, not {arity}.")
+        if max_size is not None and (max_size < 1 or len(tree) > max_size):
+            raise ValueError(f"A max_size of {max_size} cannot hold a tree of {len(tree)} nodes.")
         self.is_min_heap = is_min_heap
+        self.arity = arity
+        self.max_size = max_size
+        self._sequence: Optional[Iterator[int]] = itertools.count() if stable else None
+        self._key = key
+        self._comparator = comparator
+        # whether my_tree holds (sort key, value, priority) rather than (priority, value)
+        self._decorated = stable or key is not None
+        # the comparison is picked once, here, so that the heapify loops never have to check is_min_heap.
+        if comparator is None:
+            self._before: Callable[[Any, Any], bool] = operator.lt if is_min_heap else operator.gt
+        elif stable:
+            self._before = self._stable_comparator(comparator)
+        else:
+            self._before = comparator
+        self.my_tree: List[Node] = [self._make_node(n[0], n[1]) for n in tree] if self._decorated else list(tree)
+        self.observer: Optional[HeapObserver[T]] = observer if observer is not None else default_observer
+        self._needs_heapify = False
+        self.compaction_ratio = compaction_ratio
+        # for lazy deletion: the live nodes in my_tree holding each value, and the dead nodes, all by id(node). A
+        # node's id is its entry id; see _track_node.
+        self._live_nodes: Optional[Dict[T, Dict[int, Node]]] = {} if lazy_deletion else None
+        self._dead_nodes: Dict[int, Node] = {}
+        self.stats: Optional[QueueStats] = None
+        if lazy_deletion:
+            self.my_tree[:] = [self._track_node(node) for node in self.my_tree]
+        if heapify:
+            self.build_heap()
 
     def node_at_index(self, index: int) -> Node:
         """
@@ -29,7 +188,7 @@ class PriorityQueue(Generic[T]):
         """
         if self.in_bounds(index):
             return self.my_tree[index]
-        raise IndexError(f"Index {index} is out of bounds for tree of size {len(self)}")
+        raise IndexError(f"Index {index} is out of bounds for tree of size {len(self.my_tree)}")
 
     def set_node_at_index(self, in_node: Node, index: int):
         """
@@ -44,39 +203,49 @@ class PriorityQueue(Generic[T]):
             old_node = self.my_tree[index]
             self.my_tree[index] = in_node
             return old_node
-        raise IndexError(f"Index {index} is out of bounds for tree of size {len(self)}")
+        raise IndexError(f"Index {index} is out of bounds for tree of size {len(self.my_tree)}")
 
-    @staticmethod
-    def left_child_of_index(index: int) -> int:
+    def left_child_of_index(self, index: int) -> int:
         """
-        gives the index of the tree that is directly below and to the left of the given index.
+        gives the index of the tree that is directly below and to the left of the given index - the first of its
+        self.arity children.
         Note: the index may be out of bounds.
         :param index:
         :return: index of left child of node at index
         """
-        return 2 * index + 1
+        return self.arity * index + 1
 
-    @staticmethod
-    def right_child_of_index(index: int) -> int:
+    def right_child_of_index(self, index: int) -> int:
         """
-        gives the index of the tree that is directly below and to the right of the given index.
+        gives the index of the tree that is directly below and to the right of the given index - the last of its
+        self.arity children. In a binary heap, this is the node right after the left child.
         Note: the index may be out of bounds.
         :param index:
         :return: index of right child of node at index
         """
-        return 2 * index + 2
+        return self.arity * index + self.arity
 
-    @staticmethod
-    def parent_of_index(index: int) -> int:
+    def children_of_index(self, index: int) -> range:
+        """
+        gives the indices of all the children of the given index that are in bounds, left to right.
+        :param index:
+        :return: range of child indices; empty for a leaf
+        """
+        first = self.arity * index + 1
+        return range(min(first, len(self.my_tree)), min(first + self.arity, len(self.my_tree)))
+
+    def parent_of_index(self, index: int) -> int:
         """
         gives the index of the tree that is the parent of the given index
         :param index:
         :return index above the given node index:
         """
-        return int((index - 1) / 2)  # yay, integer math!
+        if index <= 0:
+            return 0
+        return (index - 1) // self.arity  # yay, integer math!
 
     def __len__(self):
-        return len(self.my_tree)
+        return self.live_count  # dead nodes don't count, just as in is_empty.
 
     def in_bounds(self, index: int) -> bool:
         """
@@ -84,7 +253,7 @@ class PriorityQueue(Generic[T]):
         :param index:
         :return:
         """
-        return 0 <= index < len(self)
+        return 0 <= index < len(self.my_tree)
 
     def has_left_child(self, index: int) -> bool:
         """
@@ -105,39 +274,85 @@ class PriorityQueue(Generic[T]):
     def a_has_priority_over_b(self, a: Node, b: Node) -> bool:
         """
         Determines whether the node "a" has priority over node "b." This is determined by the priorities of "a" and "b"
-        and by self.is_min_heap - i.e, should the higher node prevail, or the lower node?
+        and by self.is_min_heap - i.e, should the higher node prevail, or the lower node? (Or by the comparator, if
+        this queue was given one.)
         If the values are equal, then we _do not_ say that the "a" node has priority.
         """
-        if self.is_min_heap:
-            return a[0] < b[0]
-        return a[0] > b[0]
+        return self._before(a[0], b[0])
+
+    @staticmethod
+    def _stable_comparator(comparator: Callable[[Any, Any], bool]) -> Callable[[Any, Any], bool]:
+        """
+        extends a comparator on sort keys to (sort key, sequence number) pairs, so that ties go to the older node.
+        """
+        def before(a, b) -> bool:
+            return comparator(a[0], b[0]) or (not comparator(b[0], a[0]) and a[1] < b[1])
+        return before
 
     def is_empty(self) -> bool:
-        return len(self) == 0
+        return len(self.my_tree) == len(self._dead_nodes)  # dead nodes don't count.
+
+    def iter_tree_lines(self, root: int = 0, levels: Optional[int] = None,
+                        indices_to_color: Sequence[int] = ()) -> Iterator[str]:
+        """
+        Draws the tree one line at a time, without changing it: a line of dashes, then one line per level. Only the
+        levels being drawn count towards the width, so the output stays small however big the heap is, as long as
+        levels is small.
+        :param root: the index of the node to draw the subtree of; 0 draws the whole tree.
+        :param levels: how many levels of that subtree to draw; all of them if None.
+        :param indices_to_color: the nodes at these indices are drawn in color, the nth index in the nth color.
+        :return: the lines, without line endings
+        """
+        tree = self.my_tree
+        arity = self.arity
+        size = len(tree)
+        depth = 0
+        first, count = root, 1  # the first index, and the number of indices, on the level being looked at
+        while first * arity + 1 < size and (levels is None or depth + 1 < levels):
+            first, count = first * arity + 1, count * arity
+            depth += 1
+        colors: Dict[int, int] = {}
+        for position, index in enumerate(indices_to_color):
+            colors.setdefault(index, position % len(COLOR_STARTERS))
+        spaces_per_item = 4 * arity ** depth  # sneaky code to make the tree only as wide as needed.
+        yield "-" * (spaces_per_item * 2)
+        first, count = root, 1
+        while first < size and (levels is None or levels > 0):
+            blocks = []
+            for index in range(first, min(first + count, size)):
+                item = self._export_node(tree[index])
+                block = f"{item[0]}:{item[1]}"
+                whitespace = " " * int(spaces_per_item - (len(block)) / 2)
+                if index in colors:
+                    blocks.append(f"{COLOR_STARTERS[colors[index]]}{whitespace}{block}{whitespace}{COLOR_RESET}")
+                else:
+                    blocks.append(f"{whitespace}{block}{whitespace}")
+            yield "".join(blocks)
+            first, count = first * arity + 1, count * arity
+            spaces_per_item /= arity
+            if levels is not None:
+                levels -= 1
+
+    def _join_tree_lines(self, lines: Iterator[str]) -> str:
+        """
+        joins the lines of a whole-tree drawing the way __str__ always has: each line ends with a line break, except
+        a last level that isn't full.
+        """
+        result = "\n".join(lines)
+        full_levels_size, level_size = 0, 1
+        while full_levels_size < len(self.my_tree):
+            full_levels_size += level_size
+            level_size *= self.arity
+        return result + "\n" if full_levels_size == len(self.my_tree) else result
 
     def __str__(self):
         """
-        Draws a string representation of this tree, without changing it.
+        Draws a string representation of this tree, without changing it. For big trees, iter_tree_lines can draw
+        just part of it.
         ( you are welcome to examine this code, but you are not responsible for it.)
         :return:
         """
-        spaces_per_item = 2 ** (int(
-            math.log(len(self)) / math.log(2)) + 2)  # sneaky code to make the tree only as wide as needed.
-        result = "-" * (spaces_per_item * 2)
-        result += "\n"
-        items_per_row = 1
-        items_in_current_row = 0
-        for item in self.my_tree:
-            block = f"{item[0]}:{item[1]}"
-            whitespace = " " * int(spaces_per_item - (len(block)) / 2)
-            result += f"{whitespace}{block}{whitespace}"
-            items_in_current_row += 1
-            if items_in_current_row == items_per_row:
-                items_in_current_row = 0
-                items_per_row *= 2
-                spaces_per_item /= 2
-                result += "\n"
-        return result
+        return self._join_tree_lines(self.iter_tree_lines())
 
     def __repr__(self):
         return self.__str__()
@@ -150,45 +365,17 @@ class PriorityQueue(Generic[T]):
         ( you are welcome to examine this code, but you are not responsible for it.)
         :return:
         """
-        starters = ["\u001b[31m", "\u001b[32m", "\u001b[33m", "\u001b[34m", "\u001b[35m", "\u001b[36m"]
-        reset = "\u001b[0m"
-
-        spaces_per_item = 2 ** (int(
-            math.log(len(self)) / math.log(2)) + 2)  # sneaky code to make the tree only as wide as needed.
-        result = "-" * (spaces_per_item * 2)
-        result += "\n"
-        items_per_row = 1
-        items_in_current_row = 0
-        counter = 0
-        for item in self.my_tree:
-            block = f"{item[0]}:{item[1]}"
-            num_spaces = int(spaces_per_item - (len(block)) / 2)
-            if counter in indices_to_color:
-                col_num = indices_to_color.index(counter) % len(starters)
-                result += starters[col_num]
-                result += f"{' ' * num_spaces}{block}{' ' * num_spaces}"
-                result += reset
-            else:
-                result += f"{' ' * num_spaces}{block}{' ' * num_spaces}"
-
-            items_in_current_row += 1
-            if items_in_current_row == items_per_row:
-                items_in_current_row = 0
-                items_per_row *= 2
-                spaces_per_item /= 2
-                result += "\n"
-            counter += 1
-        return result
+        return self._join_tree_lines(self.iter_tree_lines(indices_to_color=indices_to_color))
 
     def to_string_as_list(self):
         """
         creates a string that has one node per line, listed with an index.
         :return:  string with a linear interpretation of the self.tree. Mostly useful for debugging.
         """
-        if len(self) == 0:
+        if len(self.my_tree) == 0:
             return "Empty."
         result = ""
-        for i in range(len(self)):
+        for i in range(len(self.my_tree)):
             result += f"{i}:\t{self.my_tree[i]}\n"
         return result
 
@@ -197,82 +384,432 @@ class PriorityQueue(Generic[T]):
         removes all items from this priority queue.
         :return None:
         """
-        self.my_tree = []
+        del self.my_tree[:]
+        self._needs_heapify = False
+        if self._live_nodes is not None:
+            self._live_nodes = {}
+        self._dead_nodes = {}
 
-    def is_a_heap(self) -> bool:
+    def enable_stats(self, stats: Optional[QueueStats] = None) -> QueueStats:
+        """
+        starts counting this queue's operations, comparisons and sift moves, and timing each operation. The counting
+        is done by instance attributes that stand in for this queue's methods (and for self._before), so a queue
+        without stats pays nothing for them. Moves are only counted for list-backed queues.
+        :param stats: where to count; new QueueStats if not given. Several queues can share one.
+        :return: the stats being counted into
+        """
+        if self.stats is not None:
+            self.disable_stats()
+        self.stats = stats = stats if stats is not None else QueueStats()
+        self._uncounted_before = before = self._before
+
+        def counting_before(a, b) -> bool:
+            stats.comparisons += 1
+            return before(a, b)
+
+        self._before = counting_before
+        if type(self.my_tree) is list:
+            self.my_tree = CountingList(self.my_tree, stats)
+        for name in TIMED_OPERATIONS:
+            if hasattr(self, name):
+                setattr(self, name, self._timed(name, getattr(self, name), stats))
+        for name in SIFTS:
+            setattr(self, name, self._measured_sift(getattr(self, name), stats))
+        return stats
+
+    def disable_stats(self):
+        """
+        stops counting, putting back the queue's own methods.
+        :return None:
+        """
+        if self.stats is None:
+            return
+        for name in TIMED_OPERATIONS + SIFTS:
+            self.__dict__.pop(name, None)
+        self._before = self._uncounted_before
+        del self._uncounted_before
+        if type(self.my_tree) is CountingList:
+            self.my_tree = list(self.my_tree)
+        self.stats = None
+
+    @staticmethod
+    def _timed(name: str, method: Callable, stats: QueueStats) -> Callable:
+        perf_counter_ns = time.perf_counter_ns
+        record = stats.record
+
+        def timed(*args, **kwargs):
+            start = perf_counter_ns()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                record(name, perf_counter_ns() - start)
+
+        return timed
+
+    @staticmethod
+    def _measured_sift(method: Callable, stats: QueueStats) -> Callable:
+        def measured(*args, **kwargs):
+            writes = stats.writes
+            method(*args, **kwargs)
+            if stats.writes > writes:  # one write puts the node down; any before it moved other nodes a level.
+                stats.record_sift(stats.writes - writes - 1)
+
+        return measured
+
+    def first_heap_violation(self) -> Optional[Tuple[int, int]]:
+        """
+        walks the tree once, comparing each node to its parent, and finds the first child that has greater priority
+        than its parent.
+        :return: (parent index, child index) of the first bad pair, or None if self.my_tree is a heap.
+        postcondition: the tree is unchanged
+        """
+        tree = self.my_tree
+        before = self._before
+        arity = self.arity
+        for child_index in range(1, len(tree)):
+            parent_index = (child_index - 1) // arity
+            if before(tree[child_index][0], tree[parent_index][0]):
+                return parent_index, child_index
+        return None
+
+    def is_a_heap(self, sample_size: Optional[int] = None) -> bool:
         """
         checks whether the self.my_tree variable holds a representation that is a heap. Any tree is considered a heap
         until you find a child that has greater priority than its parent.
+        :param sample_size: if given, only this many randomly chosen parent/child pairs are checked, which is O(k)
+        instead of O(n). A True result is then only probably correct; a False result is always correct.
         :return whether _all_ nodes are in a heap-like relationship with parents and children:
         """
-        index = 0
-        tree_len = self.my_tree.__len__()
-        while self.in_bounds(index):
-            for i in range(tree_len):
-                if self.has_left_child(i) and self.has_right_child(i):
-                    left_has_priority = self.a_has_priority_over_b(self.my_tree[self.left_child_of_index(i)],
-                                                  self.my_tree[i])
-                    right_has_priority = self.a_has_priority_over_b(
-                            self.my_tree[self.right_child_of_index(i)], self.my_tree[i])
-                    if left_has_priority or right_has_priority:
-                        return False
-                if self.has_left_child(i):
-                    if self.a_has_priority_over_b(self.my_tree[self.left_child_of_index(i)],
-                                                  self.my_tree[i]):
-                        return False
-            index += 1
-        logging.info("This is a heap.")
+        if sample_size is None:
+            return self.first_heap_violation() is None
+        tree = self.my_tree
+        if len(tree) < 2:
+            return True
+        for _ in range(sample_size):
+            child_index = random.randrange(1, len(tree))
+            if self.a_has_priority_over_b(tree[child_index], tree[self.parent_of_index(child_index)]):
+                return False
+        return True
+
+    def save(self, path: str):
+        """
+        writes this queue's nodes to path, in tree order, so that load can bring the queue back without heapifying
+        it again. Priorities must all be ints that fit in 64 bits, or floats; values must be picklable. Dead nodes
+        are swept out first. The file is written next to path and then moved into place, so a crash part way
+        through leaves any old snapshot at path as it was.
+        :return None:
+        """
+        self._ensure_heap()
+        if self._dead_nodes:
+            self.compact()
+        nodes = [self._export_node(node) for node in self.my_tree]
+        if all(type(node[0]) is int for node in nodes):
+            typecode = "q"
+        elif all(type(node[0]) in (int, float) for node in nodes):
+            typecode = "d"
+        else:
+            raise TypeError("save needs every priority to be an int or a float.")
+        priorities = array(typecode, (node[0] for node in nodes))
+        # a stable queue's sequence numbers are saved too, so that ties still come out first in, first out.
+        sequences = array("Q", map(self._sequence_of, self.my_tree) if self._sequence is not None else ())
+        payloads = [pickle.dumps(node[1], pickle.HIGHEST_PROTOCOL) for node in nodes]
+        offsets = array("Q", [0])
+        for payload in payloads:
+            offsets.append(offsets[-1] + len(payload))
+        if sys.byteorder == "big":
+            priorities.byteswap()
+            sequences.byteswap()
+            offsets.byteswap()
+        temporary_path = f"{path}.tmp"
+        with open(temporary_path, "wb") as file:
+            file.write(SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, self.is_min_heap, typecode.encode(),
+                                            self.arity, self._sequence is not None, len(nodes)))
+            file.write(priorities.tobytes())
+            file.write(sequences.tobytes())
+            file.write(offsets.tobytes())
+            file.writelines(payloads)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporary_path, path)
+
+    @classmethod
+    def load(cls, path: str, validate: bool = False, use_mmap: bool = True, **kwargs) -> "PriorityQueue[T]":
+        """
+        makes a queue from a file written by save. The nodes are put straight into my_tree in the order they were
+        saved, which is already heap order, so nothing is heapified and nothing is logged.
+        :param validate: if True, check in O(n) that the nodes really are in heap order, and raise a ValueError if not.
+        :param use_mmap: if True, the file is memory-mapped and read in place rather than copied into memory first.
+        :param kwargs: any other arguments for the new queue. is_min_heap and arity come from the file; pass the same
+        stable, key or comparator options the saved queue had, or the nodes may not be in heap order for this one.
+        raises a ValueError if path isn't a snapshot.
+        """
+        with open(path, "rb") as file:
+            data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) if use_mmap else file.read()
+        view = memoryview(data)
+        priorities = sequences = offsets = payloads = None
+        try:
+            if len(view) < SNAPSHOT_HEADER.size:
+                raise ValueError(f"{path} is too short to be a PriorityQueue snapshot.")
+            magic, version, is_min_heap, typecode, arity, has_sequences, count = SNAPSHOT_HEADER.unpack_from(view)
+            if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+                raise ValueError(f"{path} is not a version {SNAPSHOT_VERSION} PriorityQueue snapshot.")
+            typecode = typecode.decode()
+            priorities_start = SNAPSHOT_HEADER.size
+            sequences_start = priorities_start + 8 * count
+            offsets_start = sequences_start + (8 * count if has_sequences else 0)
+            payloads_start = offsets_start + 8 * (count + 1)
+            if sys.byteorder == "big":
+                priorities = array(typecode, view[priorities_start:sequences_start])
+                sequences = array("Q", view[sequences_start:offsets_start])
+                offsets = array("Q", view[offsets_start:payloads_start])
+                priorities.byteswap()
+                sequences.byteswap()
+                offsets.byteswap()
+            else:
+                priorities = view[priorities_start:sequences_start].cast(typecode)
+                sequences = view[sequences_start:offsets_start].cast("Q")
+                offsets = view[offsets_start:payloads_start].cast("Q")
+            payloads = view[payloads_start:]
+            loads = pickle.loads
+            nodes = [(priorities[i], loads(payloads[offsets[i]:offsets[i + 1]])) for i in range(count)]
+            saved_sequences = list(sequences)
+            if arity != 2:
+                kwargs["arity"] = arity
+        finally:
+            for part in (priorities, sequences, offsets, payloads, view):
+                if isinstance(part, memoryview):
+                    part.release()
+            if use_mmap:
+                data.close()
+        queue = cls(is_min_heap=bool(is_min_heap), **kwargs)
+        if saved_sequences and queue._sequence is not None:
+            queue._sequence = iter(saved_sequences)  # so that _make_node gives each node back its old number.
+            queue.add_values(nodes, lazy=True)
+            queue._sequence = itertools.count(max(saved_sequences) + 1)
+        else:
+            queue.add_values(nodes, lazy=True)
+        queue._needs_heapify = False  # the nodes were saved in heap order.
+        if validate:
+            violation = queue.first_heap_violation()
+            if violation is not None:
+                raise ValueError(f"{path} is not in heap order: node {violation[1]} has priority over its parent, "
+                                 f"node {violation[0]}.")
+        return queue
+
+    def build_heap(self):
+        """
+        rearranges all of self.my_tree into a heap, bottom-up: every parent, from the last one back to the root, is
+        heapified down. This is O(n), rather than the O(n log n) of adding the nodes one at a time.
+        postcondition: the tree is a heap
+        """
+        self._needs_heapify = False
+        for index in range(self.parent_of_index(len(self.my_tree) - 1), -1, -1):
+            self.heapify_down(index)
+
+    def add_values(self, nodes: Iterable[Node], lazy: bool = False):
+        """
+        adds many (priority, value) nodes at once. They are all appended first and the heap is repaired once
+        afterwards - by heapifying up each new node if there are only a few of them, or by rebuilding the whole heap
+        if there are many.
+        :param nodes: the (priority, value) pairs to add
+        :param lazy: if True, the repair is put off until the next peek or pop, so that several batches in a row
+        only pay for one rebuild.
+        :return None:
+        """
+        if self.max_size is not None:
+            # fill whatever room is left as one batch; past that, every node has to go through pushpop.
+            nodes = iter(nodes)
+            room = max(self.max_size - self.live_count, 0)
+            self._add_values_unbounded(itertools.islice(nodes, room), lazy)
+            for node in nodes:
+                self.pushpop(node[1], node[0])
+            return
+        self._add_values_unbounded(nodes, lazy)
+
+    def _add_values_unbounded(self, nodes: Iterable[Node], lazy: bool):
+        if self._decorated:
+            nodes = [self._make_node(node[0], node[1]) for node in nodes]
+        self._append_stored_nodes(nodes, lazy)
+
+    def _append_stored_nodes(self, nodes: Iterable[Node], lazy: bool):
+        """
+        appends nodes that are already in the form my_tree stores, then repairs the heap as add_values describes.
+        """
+        if self._live_nodes is not None:
+            nodes = [self._track_node(node) for node in nodes]
+        start = len(self.my_tree)
+        self.my_tree.extend(nodes)
+        added = len(self.my_tree) - start
+        if lazy:
+            self._needs_heapify = True
+        elif self._needs_heapify or added * len(self.my_tree).bit_length() > len(self.my_tree):
+            self.build_heap()
+        else:
+            for index in range(start, len(self.my_tree)):
+                self.heapify_up(index)
+
+    def meld(self, other: "PriorityQueue[T]"):
+        """
+        moves every node of other into this queue, leaving other empty. The nodes are appended and the heap is
+        rebuilt in one go, which is O(n + m), rather than the O(m log(n + m)) of popping other into this queue.
+        If other orders its nodes the same way as this queue, its stored nodes (sort keys and all) are taken as they
+        are; otherwise each one is added again as a (priority, value) node, so this queue's own ordering rules apply.
+        """
+        if other is self:
+            raise ValueError("A PriorityQueue cannot be melded with itself.")
+        if other._dead_nodes:
+            other.compact()  # so that its dead nodes don't come back to life here.
+        if self.max_size is None and self._can_adopt_nodes_of(other):
+            other._ensure_heap()
+            self._append_stored_nodes(other.my_tree, lazy=False)
+        else:
+            self.add_values([other._export_node(node) for node in other.my_tree])
+        other.clear()
+
+    def _can_adopt_nodes_of(self, other: "PriorityQueue[T]") -> bool:
+        """
+        whether the nodes stored in other.my_tree can go straight into self.my_tree: same kind of queue, same node
+        layout and the same ordering.
+        """
+        return (type(other) is type(self) and other._decorated == self._decorated and other._key is self._key
+                and other._before is self._before and (other._sequence is None) == (self._sequence is None))
+
+    def _ensure_heap(self):
+        """
+        finishes any rebuild that add_values(lazy=True) put off, and drops any dead nodes from the front of the
+        queue.
+        """
+        if self._needs_heapify:
+            self.build_heap()
+        if self._dead_nodes:
+            self._drop_dead_roots()
+
+    def _track_node(self, node: Node) -> Node:
+        """
+        records a node that is going into my_tree as a live entry of this lazy_deletion queue, and gives back the
+        node to store. Entries are told apart by id, so a node object that is already in the queue (the same tuple
+        added twice) is copied first.
+        """
+        entries = self._live_nodes.get(node[1])
+        if entries is None:
+            entries = self._live_nodes[node[1]] = {}
+        if id(node) in entries or id(node) in self._dead_nodes:
+            node = tuple(list(node))
+        entries[id(node)] = node
+        return node
+
+    def _untrack_node(self, node: Node):
+        """
+        forgets a live node that has left my_tree.
+        """
+        entries = self._live_nodes[node[1]]
+        del entries[id(node)]
+        if not entries:
+            del self._live_nodes[node[1]]
+
+    @property
+    def live_count(self) -> int:
+        """
+        how many nodes in the queue have not been discarded.
+        """
+        return len(self.my_tree) - len(self._dead_nodes)
+
+    @property
+    def dead_count(self) -> int:
+        """
+        how many discarded nodes are still taking up space in my_tree.
+        """
+        return len(self._dead_nodes)
+
+    def discard(self, value: T) -> bool:
+        """
+        cancels the most recently added live node holding value, in O(1). That node - that entry, not every node
+        equal to it - is marked dead and will be skipped when it reaches the front, so a value can be discarded and
+        then added again straight away. If that leaves more than compaction_ratio of my_tree dead, the queue is
+        compacted. Only for queues made with lazy_deletion=True.
+        :return: whether there was a live node with this value to discard
+        """
+        if self._live_nodes is None:
+            raise TypeError("discard needs a PriorityQueue made with lazy_deletion=True.")
+        entries = self._live_nodes.get(value)
+        if not entries:
+            return False
+        entry_id, node = entries.popitem()
+        if not entries:
+            del self._live_nodes[value]
+        self._dead_nodes[entry_id] = node
+        if len(self._dead_nodes) > self.compaction_ratio * len(self.my_tree):
+            self.compact()
         return True
 
+    def compact(self):
+        """
+        sweeps every dead node out of my_tree and rebuilds the heap, in O(n).
+        postcondition: the tree is a heap with no dead nodes
+        """
+        dead_nodes = self._dead_nodes
+        self.my_tree[:] = [node for node in self.my_tree if id(node) not in dead_nodes]
+        dead_nodes.clear()
+        self.build_heap()
+
+    def _drop_dead_roots(self):
+        """
+        pops dead nodes off the front of the queue until a live one (or nothing) is left there.
+        """
+        tree = self.my_tree
+        dead_nodes = self._dead_nodes
+        while tree and id(tree[0]) in dead_nodes:
+            del dead_nodes[id(tree[0])]
+            last = tree.pop()
+            if tree:
+                tree[0] = last
+                self.heapify_down(0)
+
     def add_value(self, value: T, priority: int = 1):
         """
         adds a node to this data structure and makes sure that the my_tree data structure is
         still a heap.
         :param value: the value to store
         :param priority: its relative weight
-        :return None:
+        :return: None - unless this queue has a max_size and is full, in which case the node that did not fit (either
+        the evicted front of the queue or the new node itself)
         """
-        logging.info("-" * 128)
-        logging.info(f"Adding: [{priority = }, {value = }]")
-        self.my_tree.append((priority, value))  # makes a new, 2-element list and adds it to the main array.
-        self.heapify_up(len(self) - 1)
-        logging.info(self)
+        if self.max_size is not None and self.live_count >= self.max_size:
+            return self.pushpop(value, priority)
+        node = self._make_node(priority, value) if self._decorated else (priority, value)
+        if self._live_nodes is not None:
+            node = self._track_node(node)
+        self.my_tree.append(node)  # makes a new, 2-element tuple and adds it to the main array.
+        if not self._needs_heapify:  # otherwise the pending rebuild will take care of it.
+            self.heapify_up(len(self.my_tree) - 1)
+        if self.observer is not None:
+            self.observer.node_added(self, self._export_node(node))
 
     def heapify_up(self, index: int):
         """
         given the index, potentially swaps itself with its parent, and onward up the tree
         as needed to make this a heap.
+        Rather than swapping at every level, the moving node is held aside while each parent that it beats slides down
+        into the "hole" below it; the node is written once, where it finally belongs.
         precondition: The node at index is the only one in my_tree that is un-heaplike
         :param index:
         :return None:
         """
-        pass
-        while index is not 0:
-            current_node: "Node" = self.node_at_index(index)
-            parent_node: "Node" = self.node_at_index(self.parent_of_index(index))
-            if index is 0:
+        tree = self.my_tree
+        if not 0 <= index < len(tree):
+            raise IndexError(f"Index {index} is out of bounds for tree of size {len(tree)}")
+        before = self._before
+        arity = self.arity
+        node = tree[index]
+        node_key = node[0]
+        while index > 0:
+            parent_index = (index - 1) // arity
+            parent_node = tree[parent_index]
+            if not before(node_key, parent_node[0]):  # ties stay put.
                 break
-            else:
-                if self.a_has_priority_over_b(current_node, parent_node):
-                    self.set_node_at_index(parent_node, index)
-                    self.set_node_at_index(current_node, self.parent_of_index(index))
-                    index = self.parent_of_index(index)
-                else:
-                    break
-                    # replace original with parent, parent with original
-
-        # tree_len = self.my_tree.__len__()
-        # while not self.is_a_heap():
-        #     if self.has_left_child(tree_len):
-        #         if self.a_has_priority_over_b(self.my_tree[self.left_child_of_index(tree_len)],
-        #                                       self.my_tree[self.parent_of_index(tree_len)]):
-        #             self.set_node_at_index(self.my_tree[tree_len], self.left_child_of_index(tree_len))
-        #     if self.has_right_child(tree_len):
-        #         if self.a_has_priority_over_b(self.my_tree[self.right_child_of_index(tree_len)],
-        #                                       self.my_tree[self.parent_of_index(tree_len)]):
-        #             self.set_node_at_index(self.my_tree[tree_len], self.right_child_of_index(tree_len))
-        #     tree_len -= 1
-        # ----------------------
+            tree[index] = parent_node
+            index = parent_index
+        tree[index] = node
 
     def peek(self) -> Node:
         """
@@ -280,7 +817,8 @@ class PriorityQueue(Generic[T]):
         """
         if self.is_empty():
             raise IndexError("Attempted to peek at an empty Queue.")
-        return self.my_tree[0]
+        self._ensure_heap()
+        return self._export_node(self.my_tree[0])
 
     def pop(self) -> Node:
         """
@@ -289,51 +827,347 @@ class PriorityQueue(Generic[T]):
         """
         if self.is_empty():
             raise IndexError("Attempted to pop from an empty Queue.")
+        self._ensure_heap()
         result: "Node" = self.my_tree[0]
-        self.my_tree[0] = self.my_tree[-1]
-        del (self.my_tree[-1])
-        logging.info("*" * 128)
-        logging.info("Just popped {result}")
-        self.heapify_down()
-        logging.info(self)
+        last: "Node" = self.my_tree.pop()
+        if self.my_tree:
+            self.my_tree[0] = last
+            self.heapify_down()
+        if self._live_nodes is not None:
+            self._untrack_node(result)
+        result = self._export_node(result)
+        if self.observer is not None:
+            self.observer.node_popped(self, result)
+        return result
+
+    def pushpop(self, value: T, priority: int = 1) -> Node:
+        """
+        Adds a node and then pops the front of the queue, as one step: if the new node would come out first anyway
+        (including a tie with the current front), it is handed straight back and the tree is untouched; otherwise it
+        replaces the front, which is heapified down and returned. Either way this is at most one O(log n) sift.
+        """
+        if self.is_empty():
+            return priority, value
+        self._ensure_heap()
+        tree = self.my_tree
+        node = self._make_node(priority, value)
+        root = tree[0]
+        if not self.a_has_priority_over_b(root, node):
+            return priority, value
+        if self._live_nodes is not None:
+            node = self._track_node(node)
+            self._untrack_node(root)
+        tree[0] = node
+        self.heapify_down(0)
+        root = self._export_node(root)
+        if self.observer is not None:
+            self.observer.node_popped(self, root)
+            self.observer.node_added(self, (priority, value))
+        return root
+
+    def replace(self, value: T, priority: int = 1) -> Node:
+        """
+        Pops the front of the queue and then adds a node, as one step: the new node takes the place of the front and
+        is heapified down. Unlike pushpop, the old front is always what comes back, even if the new node has more
+        priority.
+        """
+        if self.is_empty():
+            raise IndexError("Attempted to replace the front of an empty Queue.")
+        self._ensure_heap()
+        root = self.my_tree[0]
+        node = self._make_node(priority, value)
+        if self._live_nodes is not None:
+            node = self._track_node(node)
+            self._untrack_node(root)
+        self.my_tree[0] = node
+        self.heapify_down(0)
+        root = self._export_node(root)
+        if self.observer is not None:
+            self.observer.node_popped(self, root)
+            self.observer.node_added(self, (priority, value))
+        return root
+
+    def push_many(self, priorities: Sequence[int], values: Sequence[T]):
+        """
+        adds values[i] with priorities[i] for every i, repairing the heap once for the whole batch (see add_values).
+        :return: whatever add_values returns
+        """
+        if len(priorities) != len(values):
+            raise ValueError(f"Got {len(priorities)} priorities for {len(values)} values.")
+        return self.add_values(zip(priorities, values))
+
+    def pop_many(self, k: int) -> List[Node]:
+        """
+        Removes the first k nodes of this Priority Queue (or all of them, if there are fewer than k) and returns them
+        in order. This does the same work as k calls to pop, without the per-call overhead.
+        """
+        export = self._export_node
+        return [export(node) for node in self._pop_many_stored(k)]
+
+    def _pop_many_stored(self, k: int) -> List[Node]:
+        """
+        does the work of pop_many, giving back the nodes just as they were stored in my_tree.
+        """
+        self._ensure_heap()
+        tree = self.my_tree
+        heapify_down = self.heapify_down
+        observer = self.observer
+        result = []
+        for _ in range(k):
+            if self._dead_nodes:
+                self._drop_dead_roots()
+            if not tree:
+                break
+            node = tree[0]
+            last = tree.pop()
+            if tree:
+                tree[0] = last
+                heapify_down(0)
+            if self._live_nodes is not None:
+                self._untrack_node(node)
+            if observer is not None:
+                observer.node_popped(self, self._export_node(node))
+            result.append(node)
         return result
 
-    def heapify_down(self, index: int = 0):
+    def top_k(self, k: int) -> List[Node]:
+        """
+        Gives the first k nodes of this Priority Queue in order, without removing them. This is O(k log k), no matter
+        how big the queue is (see _indices_in_order).
+        postcondition: the tree is unchanged
+        """
+        return list(itertools.islice(self.iter_sorted(), k))
+
+    def iter_sorted(self) -> Iterator[Node]:
+        """
+        Gives every node of this Priority Queue in the order pops would, lazily and without removing or copying
+        them; getting the next node is O(log of how many have been given so far) (see _indices_in_order). Don't
+        change the queue while iterating.
+        postcondition: the tree is unchanged
+        """
+        self._ensure_heap()
+        tree = self.my_tree
+        export = self._export_node
+        indices = self._indices_in_order()
+        if self._dead_nodes:
+            dead_nodes = self._dead_nodes
+            indices = (index for index in indices if id(tree[index]) not in dead_nodes)
+        for index in indices:
+            yield export(tree[index])
+
+    def _sort_in_reverse(self):
+        """
+        heapsorts my_tree in place, in O(n log n) with O(1) extra memory, so that the node that would be popped first
+        ends up last. Each step swaps the root to the end of the shrinking heap and sifts down what took its place.
+        Dead nodes are swept out first, and the observer isn't told about the sifts.
+        """
+        self._ensure_heap()
+        if self._dead_nodes:
+            self.compact()
+        tree = self.my_tree
+        observer = self.observer
+        self.observer = None
+        try:
+            for end in range(len(tree) - 1, 0, -1):
+                root = tree[0]
+                tree[0] = tree[end]
+                tree[end] = root
+                self.heapify_down(0, end)
+        finally:
+            self.observer = observer
+
+    def heapsort(self):
+        """
+        sorts my_tree in place into the order pops would give, in O(n log n) with O(1) extra memory. A sorted array is
+        still a heap, so the queue keeps working as before; only the layout of my_tree changes.
+        postcondition: my_tree is in priority order, and is a heap
+        :return None:
+        """
+        self._sort_in_reverse()
+        self.my_tree.reverse()
+        self._reindex()
+
+    def drain_sorted(self) -> Iterator[Node]:
+        """
+        heapsorts the queue in place, then removes and gives its nodes one by one in the order pops would, in O(1)
+        each and without telling the observer. If the caller stops early, the nodes not yet given stay in the queue.
+        Don't use the queue in other ways until the draining is done.
+        """
+        self._sort_in_reverse()
+        tree = self.my_tree
+        export = self._export_node
+        try:
+            while tree:
+                node = tree.pop()
+                if self._live_nodes is not None:
+                    self._untrack_node(node)
+                yield export(node)
+        finally:
+            tree.reverse()  # what is left is then in priority order, which is a heap.
+            self._reindex()
+
+    def _reindex(self):
+        """
+        called after heapsort or drain_sorted has moved nodes around, for subclasses that track where nodes are.
+        """
+
+    def _indices_in_order(self) -> Iterator[int]:
+        """
+        yields the indices of my_tree in priority order without changing the tree. A second, small heap holds the
+        "frontier": the children of every index given out so far. The next index is always the best of the frontier,
+        because a node can only have priority over its own descendants. Each step costs O(log of the frontier size).
+        precondition: the tree is a heap
+        """
+        tree = self.my_tree
+        if not tree:
+            return
+        frontier: PriorityQueue[int] = self._new_index_heap()
+        frontier.add_value(0, tree[0][0])
+        while frontier.my_tree:
+            index = frontier.pop()[1]
+            yield index
+            for child_index in self.children_of_index(index):
+                frontier.add_value(child_index, tree[child_index][0])
+
+    def _new_index_heap(self) -> "PriorityQueue[int]":
+        """
+        makes an empty, untraced binary heap that orders tree indices the same way this queue orders its nodes; the
+        priority of each entry is the priority of the node at that index.
+        """
+        index_heap: PriorityQueue[int] = PriorityQueue(comparator=self._before)
+        index_heap.observer = None
+        return index_heap
+
+    def _make_node(self, priority: int, value: T) -> Node:
+        """
+        builds the node that my_tree stores for this priority and value: (priority, value), or, in a stable or keyed
+        queue, (sort key, value, priority).
+        """
+        if not self._decorated:
+            return priority, value
+        sort_key = priority if self._key is None else self._key(priority)
+        if self._sequence is None:
+            return sort_key, value, priority
+        sequence = next(self._sequence)
+        if self._key is None and self._comparator is None:
+            if type(priority) is not int:
+                raise TypeError(f"A stable PriorityQueue needs int priorities, not {priority!r} (give it a key "
+                                f"function to use other kinds of priorities).")
+            if not self.is_min_heap:
+                # so that, among equal priorities, the older node still has the higher sort key.
+                sequence = (1 << SEQUENCE_BITS) - 1 - sequence
+            return (priority << SEQUENCE_BITS) | sequence, value, priority
+        # keys that can't be packed into an int are paired with the sequence number instead.
+        if self._comparator is None and not self.is_min_heap:
+            sequence = -sequence
+        return (sort_key, sequence), value, priority
+
+    def _sequence_of(self, node: Node) -> int:
+        """
+        gives back the sequence number that _make_node gave a node in a stable queue.
+        """
+        if self._key is None and self._comparator is None:
+            sequence = node[0] & ((1 << SEQUENCE_BITS) - 1)
+            return sequence if self.is_min_heap else (1 << SEQUENCE_BITS) - 1 - sequence
+        sequence = node[0][1]
+        return -sequence if self._comparator is None and not self.is_min_heap else sequence
+
+    def _export_node(self, node: Node) -> Node:
+        """
+        turns a node as stored in my_tree into the (priority, value) node handed back to callers.
+        """
+        if self._decorated:
+            return node[2], node[1]
+        return node
+
+    def heapify_down(self, index: int = 0, size: Optional[int] = None):
         """
         The node at index is possibly too high in the tree; we compare it to its children and potentially swap
         it with one of them to put it in better order, and repeat with the node in its new location.
+        This is done in a loop, not by recursion, and like heapify_up it moves the node through a "hole" rather than
+        swapping at each level.
+        :param size: if given, only my_tree[:size] is treated as the heap; heapsort uses this as its heap shrinks.
         precondition: the tree is a heap, except possibly for the node at "index."
         postcondition: the tree is once again a heap
         """
-        if not self.in_bounds(index):
+        tree = self.my_tree
+        if size is None:
+            size = len(tree)
+        if not 0 <= index < size:
+            return
+        if self.observer is not None:
+            self._heapify_down_traced(index, size)
             return
-        print(self.to_color_string([index]))
-        current_node: "Node" = self.node_at_index(index)
-        left_index: int = self.left_child_of_index(index)
-        right_index: int = self.right_child_of_index(index)
-        if self.in_bounds(left_index):
-            if self.has_right_child(index):
-                right_node = self.node_at_index(right_index)
-                left_node = self.node_at_index(left_index)
-                if self.a_has_priority_over_b(right_node, current_node):
-                    if self.a_has_priority_over_b(right_node, left_node):
-                        self.set_node_at_index(right_node, index)
-                        self.set_node_at_index(current_node, right_index)
-                        # recursive call for right index
-                        self.heapify_down(self.right_child_of_index(index))
-                        return
-                    else:
-                        self.set_node_at_index(left_node, index)
-                        self.set_node_at_index(current_node, left_index)
-                        # recursive call for left index
-                        self.heapify_down(self.left_child_of_index(index))
-                        return
-            if self.has_left_child(index):
-                left_node = self.node_at_index(left_index)
-                if self.a_has_priority_over_b(left_node, current_node):
-                    self.set_node_at_index(left_node, index)
-                    self.set_node_at_index(current_node, left_index)
-                    # recursive call for left index
-                    self.heapify_down(self.left_child_of_index(index))
-        # Since this tree is complete, we don't need to worry about the right node if the
-        # left node was out of bounds.
+        before = self._before
+        node = tree[index]
+        if self.arity != 2:
+            self._heapify_down_d_ary(index, node, size)
+            return
+        node_key = node[0]
+        child_index = 2 * index + 1
+        while child_index < size:
+            child = tree[child_index]
+            right_index = child_index + 1
+            if right_index < size:
+                right = tree[right_index]
+                if before(right[0], child[0]):  # when the children are equal, we go left.
+                    child_index = right_index
+                    child = right
+            if not before(child[0], node_key):  # a child that only ties the node does not move up.
+                break
+            tree[index] = child
+            index = child_index
+            child_index = 2 * index + 1
+        tree[index] = node
+
+    def _heapify_down_traced(self, index: int, size: int) -> int:
+        """
+        heapify_down for a queue with an observer: the node is swapped down one level at a time, as the original
+        recursive version did, and the observer is told at every level, so that it sees the tree as it really is.
+        Ties go the same way as in the fast path.
+        :return: the index where the node stopped
+        """
+        tree = self.my_tree
+        arity = self.arity
+        before = self._before
+        while True:
+            self.observer.sifting_down(self, index)
+            node = tree[index]
+            best_index = index
+            best_key = node[0]
+            first_child = arity * index + 1
+            for child_index in range(first_child, min(first_child + arity, size)):
+                child_key = tree[child_index][0]
+                if before(child_key, best_key):
+                    best_index = child_index
+                    best_key = child_key
+            if best_index == index:
+                return index
+            tree[index] = tree[best_index]
+            tree[best_index] = node
+            index = best_index
+
+    def _heapify_down_d_ary(self, index: int, node: Node, size: int):
+        """
+        heapify_down for trees with more than two children per node: the node trades places with the child that has
+        the most priority, and the first (leftmost) child wins ties.
+        """
+        tree = self.my_tree
+        arity = self.arity
+        before = self._before
+        node_key = node[0]
+        child_index = arity * index + 1
+        while child_index < size:
+            best_index = child_index
+            best_key = tree[child_index][0]
+            for sibling_index in range(child_index + 1, min(child_index + arity, size)):
+                sibling_key = tree[sibling_index][0]
+                if before(sibling_key, best_key):
+                    best_index = sibling_index
+                    best_key = sibling_key
+            if not before(best_key, node_key):
+                break
+            tree[index] = tree[best_index]
+            index = best_index
+            child_index = arity * index + 1
+        tree[index] = node
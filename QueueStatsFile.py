@@ -0,0 +1,119 @@
+from typing import Any, Dict, Tuple
+"""
+Counters and latency histograms for a PriorityQueue, turned on with PriorityQueue.enable_stats(). A queue without
+them runs exactly the same code it always did.
+"""
+
+
+class LatencyHistogram:
+    """
+    An HDR-style histogram of durations in nanoseconds. Durations are kept to significant_bits binary digits (about
+    3% precision at the default of 5), so a few hundred buckets cover everything from 1ns to hours, and recording
+    one is a dict increment.
+    """
+
+    def __init__(self, significant_bits: int = 5):
+        self.significant_bits = significant_bits
+        self.counts: Dict[int, int] = {}  # the lowest duration in each bucket -> how many durations fell in it
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def record(self, nanoseconds: int):
+        shift = nanoseconds.bit_length() - self.significant_bits
+        bucket = nanoseconds >> shift << shift if shift > 0 else nanoseconds
+        self.counts[bucket] = self.counts.get(bucket, 0) + 1
+        self.count += 1
+        self.total += nanoseconds
+        if nanoseconds > self.max:
+            self.max = nanoseconds
+
+    def percentile(self, percent: float) -> int:
+        """
+        gives the lowest duration in the bucket holding the given percentile, or 0 if nothing has been recorded.
+        """
+        if not self.count:
+            return 0
+        rank = percent / 100 * self.count
+        seen = 0
+        for bucket in sorted(self.counts):
+            seen += self.counts[bucket]
+            if seen >= rank:
+                return bucket
+        return self.max
+
+    def summary(self) -> Dict[str, float]:
+        return {"count": self.count, "mean_ns": self.total / self.count if self.count else 0.0,
+                "p50_ns": self.percentile(50), "p90_ns": self.percentile(90), "p99_ns": self.percentile(99),
+                "p99.9_ns": self.percentile(99.9), "max_ns": self.max}
+
+
+class QueueStats:
+    """
+    What a PriorityQueue has done since these stats were made or last reset: how many times each operation ran and
+    how long each run took, how many priority comparisons were made, how many levels nodes were moved by
+    heapify_up and heapify_down (each one a swap, in the old swap-based sifts), and the most levels any one sift
+    moved a node.
+    """
+
+    def __init__(self, significant_bits: int = 5):
+        self.significant_bits = significant_bits
+        self.reset()
+
+    def reset(self):
+        """
+        zeroes every counter and empties every histogram.
+        :return None:
+        """
+        self.operations: Dict[str, int] = {}
+        self.latencies: Dict[str, LatencyHistogram] = {}
+        self.comparisons = 0
+        self.swaps = 0
+        self.max_sift_depth = 0
+        self.writes = 0  # nodes written into my_tree, counted by CountingList
+
+    def record(self, operation: str, nanoseconds: int):
+        self.operations[operation] = self.operations.get(operation, 0) + 1
+        histogram = self.latencies.get(operation)
+        if histogram is None:
+            histogram = self.latencies[operation] = LatencyHistogram(self.significant_bits)
+        histogram.record(nanoseconds)
+
+    def record_sift(self, depth: int):
+        self.swaps += depth
+        if depth > self.max_sift_depth:
+            self.max_sift_depth = depth
+
+    def snapshot(self, reset: bool = False) -> Dict[str, Any]:
+        """
+        gives every counter and a summary of every histogram as a JSON-ready dict.
+        :param reset: if True, zero everything afterwards, so that each snapshot covers the time since the last one.
+        """
+        result = {"operations": dict(self.operations), "comparisons": self.comparisons, "swaps": self.swaps,
+                  "max_sift_depth": self.max_sift_depth,
+                  "latencies": {operation: histogram.summary() for operation, histogram in self.latencies.items()}}
+        if reset:
+            self.reset()
+        return result
+
+
+class CountingList(list):
+    """
+    A list that counts, in stats.writes, every node written into it by index. A queue with stats on keeps my_tree
+    as one of these so that its sifts can be measured without changing their code.
+    """
+    __slots__ = ("stats",)
+
+    def __init__(self, nodes, stats: QueueStats):
+        super().__init__(nodes)
+        self.stats = stats
+
+    def __setitem__(self, index, node):
+        self.stats.writes += 1
+        super().__setitem__(index, node)
+
+
+# the PriorityQueue methods that enable_stats times.
+TIMED_OPERATIONS: Tuple[str, ...] = ("add_value", "add_values", "peek", "pop", "pop_many", "pushpop", "replace",
+                                     "top_k", "discard", "build_heap")
+SIFTS: Tuple[str, ...] = ("heapify_up", "heapify_down")
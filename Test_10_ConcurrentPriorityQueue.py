@@ -0,0 +1,117 @@
+import asyncio
+import threading
+import unittest
+from ConcurrentPriorityQueueFile import ThreadSafePriorityQueue, AsyncPriorityQueue
+from PriorityQueueFile import PriorityQueue, HeapObserver
+
+
+class MyTestCase(unittest.TestCase):
+    def test_threads_1(self):
+        """
+        checks that several producers and consumers hand over every node exactly once.
+        :return:
+        """
+        pq: ThreadSafePriorityQueue[int] = ThreadSafePriorityQueue[int](maxsize=50)
+        consumed = []
+        consumed_lock = threading.Lock()
+
+        def produce(start: int):
+            for value in range(start, start + 1000):
+                pq.put(value, priority=value % 97)
+
+        def consume():
+            while True:
+                priority, value = pq.pop()
+                if value is None:
+                    return
+                with consumed_lock:
+                    consumed.append(value)
+
+        producers = [threading.Thread(target=produce, args=(i * 1000,)) for i in range(4)]
+        consumers = [threading.Thread(target=consume) for _ in range(3)]
+        for thread in producers + consumers:
+            thread.start()
+        for thread in producers:
+            thread.join()
+        for _ in consumers:
+            pq.put(None, priority=1000)  # sorts after every real node
+        for thread in consumers:
+            thread.join()
+        self.assertEqual(list(range(4000)), sorted(consumed), "Nodes were lost or handed out twice.")
+
+    def test_threads_2(self):
+        """
+        checks that pop and put give up with an IndexError instead of waiting forever.
+        :return:
+        """
+        pq: ThreadSafePriorityQueue[str] = ThreadSafePriorityQueue[str](PriorityQueue(is_min_heap=False), maxsize=1)
+        with self.assertRaises(IndexError):
+            pq.pop(timeout=0.01)
+        with self.assertRaises(IndexError):
+            pq.pop(block=False)
+        pq.put("A", priority=1)
+        with self.assertRaises(IndexError):
+            pq.put("B", priority=2, timeout=0.01)
+        threading.Timer(0.05, lambda: pq.put("C", priority=3)).start()
+        self.assertEqual([(1, "A")], pq.pop_many(5), "pop_many should take what is there.")
+        self.assertEqual((3, "C"), pq.pop(timeout=5), "pop should have waited for the timer's put.")
+
+    def test_async_1(self):
+        """
+        checks that await pop waits for producers, and that a full queue makes put wait.
+        :return:
+        """
+        async def scenario():
+            pq: AsyncPriorityQueue[str] = AsyncPriorityQueue[str](maxsize=2)
+            consumer = asyncio.create_task(pq.pop())
+            await asyncio.sleep(0)
+            self.assertFalse(consumer.done(), "pop should be waiting on an empty queue.")
+            await pq.put("B", priority=2)
+            self.assertEqual((2, "B"), await consumer, "pop got the wrong node.")
+            await pq.put("D", priority=4)
+            await pq.put("C", priority=3)
+            producer = asyncio.create_task(pq.put("A", priority=1))
+            await asyncio.sleep(0)
+            self.assertFalse(producer.done(), "put should be waiting on a full queue.")
+            self.assertEqual((3, "C"), await pq.pop(), "pop got the wrong node.")
+            await producer
+            self.assertEqual([(1, "A"), (4, "D")], await pq.pop_many(5), "pop_many got the wrong nodes.")
+            with self.assertRaises(asyncio.TimeoutError):
+                await asyncio.wait_for(pq.pop(), timeout=0.01)
+
+        asyncio.run(scenario())
+
+    def test_bounded(self):
+        """
+        checks that put on a wrapped queue with a max_size gives back the node that did not fit, and tells the
+        observer about evictions and nothing about rejections.
+        :return:
+        """
+        class Recorder(HeapObserver[str]):
+            def __init__(self):
+                self.events = []
+
+            def node_added(self, queue, node):
+                self.events.append(("added", node))
+
+            def node_popped(self, queue, node):
+                self.events.append(("popped", node))
+
+        async def async_puts(pq: AsyncPriorityQueue[str]):
+            return [await pq.put("A", 5), await pq.put("B", 1), await pq.put("C", 9)]
+
+        for wrap in ("threads", "asyncio"):
+            recorder = Recorder()
+            queue = PriorityQueue[str](max_size=1, observer=recorder)
+            if wrap == "threads":
+                pq = ThreadSafePriorityQueue[str](queue)
+                results = [pq.put("A", 5), pq.put("B", 1), pq.put("C", 9)]
+            else:
+                results = asyncio.run(async_puts(AsyncPriorityQueue[str](queue)))
+            self.assertEqual([None, (1, "B"), (5, "A")], results)
+            self.assertEqual([("added", (5, "A")), ("popped", (5, "A")), ("added", (9, "C"))], recorder.events)
+            self.assertEqual([(9, "C")], queue.pop_many(5))
+
+
+if __name__ == '__main__':
+    unittest.main()
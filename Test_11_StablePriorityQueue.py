@@ -0,0 +1,41 @@
+import random
+import unittest
+from PriorityQueueFile import PriorityQueue
+
+
+class MyTestCase(unittest.TestCase):
+    def test_stable_1(self):
+        """
+        checks that equal priorities come out first in, first out, for min and max heaps.
+        :return:
+        """
+        rng = random.Random(1)
+        items = [(rng.randrange(-5, 5), i) for i in range(500)]
+        for is_min_heap in (True, False):
+            pq: PriorityQueue[int] = PriorityQueue[int](is_min_heap=is_min_heap, stable=True)
+            for priority, value in items:
+                pq.add_value(value, priority)
+            expected = sorted(items, key=lambda item: item[0], reverse=not is_min_heap)  # sorted() is stable
+            self.assertEqual(expected, [pq.pop() for _ in range(len(items))],
+                             f"Equal priorities did not come out in insertion order ({is_min_heap = }).")
+
+    def test_stable_2(self):
+        """
+        checks that a stable queue hands back (priority, value) nodes everywhere, and keeps FIFO order through a
+        bulk build, add_values and top_k.
+        :return:
+        """
+        pq: PriorityQueue[str] = PriorityQueue[str](tree=[(2, "A"), (1, "B"), (2, "C")], heapify=True, stable=True)
+        pq.add_values([(1, "D"), (2, "E")])
+        pq.add_value("F", priority=1)
+        self.assertEqual((1, "B"), pq.peek(), "peek should give the oldest of the best priority.")
+        self.assertEqual([(1, "B"), (1, "D"), (1, "F"), (2, "A")], pq.top_k(4), "top_k is not in FIFO order.")
+        self.assertEqual([(1, "B"), (1, "D")], pq.pop_many(2), "pop_many is not in FIFO order.")
+        self.assertEqual((1, "F"), pq.replace("G", priority=2), "replace gave back the wrong node.")
+        self.assertEqual(["A", "C", "E", "G"], [pq.pop()[1] for _ in range(4)], "Ties did not come out in order.")
+        with self.assertRaises(TypeError):
+            pq.add_value("H", priority=1.5)
+
+
+if __name__ == '__main__':
+    unittest.main()
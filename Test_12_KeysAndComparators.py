@@ -0,0 +1,65 @@
+import unittest
+from collections import namedtuple
+from PriorityQueueFile import PriorityQueue
+
+Job = namedtuple("Job", ["deadline", "weight"])
+
+
+class MyTestCase(unittest.TestCase):
+    def test_key_1(self):
+        """
+        checks float and tuple priorities, which need no key at all.
+        :return:
+        """
+        pq: PriorityQueue[str] = PriorityQueue[str](is_min_heap=False)
+        for priority, value in [(0.5, "B"), (2.25, "A"), (-1.0, "D"), (0.75, "C")]:
+            pq.add_value(value, priority)
+        self.assertEqual(["A", "C", "B", "D"], [pq.pop()[1] for _ in range(4)], "Float priorities came out wrong.")
+        pq = PriorityQueue[str](tree=[((2, 1), "C"), ((1, 5), "B"), ((1, 2), "A")], heapify=True)
+        self.assertEqual(["A", "B", "C"], [pq.pop()[1] for _ in range(3)], "Tuple priorities came out wrong.")
+
+    def test_key_2(self):
+        """
+        checks a key function: earliest deadline first, then heaviest weight. Nodes still come back with their
+        original priorities.
+        :return:
+        """
+        jobs = [Job(5, 1), Job(3, 2), Job(3, 9), Job(8, 4), Job(1, 1)]
+        pq: PriorityQueue[str] = PriorityQueue[str](key=lambda job: (job.deadline, -job.weight))
+        for i, job in enumerate(jobs):
+            pq.add_value(f"job {i}", job)
+        self.assertEqual((Job(1, 1), "job 4"), pq.peek(), "peek should give back the original priority.")
+        self.assertTrue(pq.is_a_heap(), "The keyed queue is not a heap.")
+        self.assertEqual(["job 4", "job 2", "job 1", "job 0", "job 3"], [pq.pop()[1] for _ in range(5)],
+                         "Jobs came out in the wrong order.")
+
+    def test_key_3(self):
+        """
+        checks a comparator, alone and together with stable ordering.
+        :return:
+        """
+        def closer_to_zero(a, b):
+            return abs(a) < abs(b)
+
+        pq: PriorityQueue[str] = PriorityQueue[str](comparator=closer_to_zero, is_min_heap=False)
+        pq.add_values([(-3, "C"), (1, "A"), (5, "D"), (-2, "B")])
+        self.assertEqual(["A", "B", "C", "D"], [pq.pop()[1] for _ in range(4)], "The comparator was not used.")
+
+        pq = PriorityQueue[str](comparator=closer_to_zero, stable=True)
+        pq.add_values([(2, "A"), (-2, "B"), (1, "C"), (-1, "D"), (2, "E")])
+        self.assertEqual(["C", "D", "A", "B", "E"], [pq.pop()[1] for _ in range(5)],
+                         "Ties under the comparator did not come out in insertion order.")
+
+    def test_key_4(self):
+        """
+        checks a stable max heap with a key, whose keys can't be packed into ints.
+        :return:
+        """
+        pq: PriorityQueue[str] = PriorityQueue[str](key=float, stable=True, is_min_heap=False)
+        pq.add_values([(1.5, "A"), (2, "B"), (1.5, "C"), (2.0, "D")])
+        self.assertEqual(["B", "D", "A", "C"], [pq.pop()[1] for _ in range(4)],
+                         "Ties in a stable max heap did not come out in insertion order.")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+import random
+import unittest
+from IndexedPriorityQueueFile import IndexedPriorityQueue
+from PairingHeapFile import PairingHeap
+from PriorityQueueFile import PriorityQueue
+
+
+class MyTestCase(unittest.TestCase):
+    def test_meld_1(self):
+        """
+        checks that melding two array heaps gives one heap holding everything, and empties the other.
+        :return:
+        """
+        rng = random.Random(1)
+        first = [(rng.randrange(100), i) for i in range(200)]
+        second = [(rng.randrange(100), i) for i in range(200, 300)]
+        for is_min_heap in (True, False):
+            pq: PriorityQueue[int] = PriorityQueue[int](first, is_min_heap=is_min_heap, heapify=True)
+            other: PriorityQueue[int] = PriorityQueue[int](second, is_min_heap=is_min_heap, heapify=True)
+            pq.meld(other)
+            self.assertTrue(other.is_empty(), "meld should empty the other queue.")
+            self.assertTrue(pq.is_a_heap(), "meld did not leave a heap.")
+            popped = pq.pop_many(300)
+            self.assertEqual(sorted(first + second), sorted(popped), "The melded queue lost nodes.")
+            self.assertEqual(sorted((node[0] for node in popped), reverse=not is_min_heap),
+                             [node[0] for node in popped], "The melded queue popped out of order.")
+        with self.assertRaises(ValueError):
+            pq.meld(pq)
+
+    def test_meld_2(self):
+        """
+        checks melding queues whose nodes are stored differently: stable into plain, and plain into indexed.
+        :return:
+        """
+        pq: PriorityQueue[str] = PriorityQueue[str](stable=True)
+        pq.add_values([(2, "A"), (1, "B")])
+        plain: PriorityQueue[str] = PriorityQueue[str]([(0, "C"), (2, "D")])
+        pq.meld(plain)
+        self.assertEqual([(0, "C"), (1, "B"), (2, "A"), (2, "D")], pq.pop_many(4), "Stable meld came out wrong.")
+
+        indexed: IndexedPriorityQueue[str] = IndexedPriorityQueue[str]()
+        handle = indexed.add_value("E", priority=5)
+        indexed.meld(PriorityQueue[str]([(3, "F"), (4, "G")]))
+        indexed.change_priority(handle, 0)
+        self.assertEqual([(0, "E"), (3, "F"), (4, "G")], indexed.pop_many(3), "Indexed meld came out wrong.")
+
+    def test_pairing_1(self):
+        """
+        checks the pairing heap against sorting, including melds along the way.
+        :return:
+        """
+        rng = random.Random(2)
+        for is_min_heap in (True, False):
+            heaps = [PairingHeap[int](is_min_heap=is_min_heap) for _ in range(4)]
+            priorities = []
+            for i in range(1000):
+                priority = rng.randrange(300)
+                priorities.append(priority)
+                heaps[i % 4].add_value(i, priority)
+            for other in heaps[1:]:
+                heaps[0].meld(other)
+                self.assertTrue(other.is_empty(), "meld should empty the other heap.")
+            self.assertEqual(1000, len(heaps[0]), "The melded heap has the wrong size.")
+            popped = [heaps[0].pop()[0] for _ in range(1000)]
+            self.assertEqual(sorted(priorities, reverse=not is_min_heap), popped, "Nodes came out of order.")
+            with self.assertRaises(IndexError):
+                heaps[0].peek()
+
+    def test_pairing_2(self):
+        """
+        checks peek, add_values and pop_many on a small pairing heap.
+        :return:
+        """
+        heap: PairingHeap[str] = PairingHeap[str]([(3, "C"), (1, "A")])
+        heap.add_values([(2, "B"), (0, "Z")])
+        self.assertEqual((0, "Z"), heap.peek(), "peek gave the wrong node.")
+        self.assertEqual([(0, "Z"), (1, "A"), (2, "B")], heap.pop_many(3), "pop_many gave the wrong nodes.")
+        self.assertEqual([(3, "C")], heap.pop_many(3), "pop_many should stop when the heap runs out.")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,150 @@
+import random
+import unittest
+from PriorityQueueFile import PriorityQueue
+
+
+class MyTestCase(unittest.TestCase):
+    def test_discard_1(self):
+        """
+        checks that discarded values are skipped by peek and pop, and that the live and dead counts add up.
+        :return:
+        """
+        pq: PriorityQueue[str] = PriorityQueue[str](lazy_deletion=True, compaction_ratio=1.0)
+        pq.add_values([(1, "A"), (2, "B"), (3, "C"), (4, "D")])
+        self.assertTrue(pq.discard("A"))
+        self.assertTrue(pq.discard("C"))
+        self.assertFalse(pq.discard("C"), "A value cannot be discarded more times than it was added.")
+        self.assertFalse(pq.discard("E"), "A value that was never added cannot be discarded.")
+        self.assertEqual(2, pq.live_count)
+        self.assertEqual(2, pq.dead_count)
+        self.assertEqual((2, "B"), pq.peek(), "peek did not skip the discarded root.")
+        self.assertEqual(1, pq.dead_count, "peek should drop the dead root it skipped.")
+        self.assertEqual([(2, "B"), (4, "D")], pq.pop_many(5), "pop_many did not skip the discarded node.")
+        self.assertTrue(pq.is_empty())
+        self.assertEqual(0, pq.dead_count)
+        with self.assertRaises(IndexError):
+            pq.pop()
+
+    def test_discard_2(self):
+        """
+        checks that discard only cancels one of several nodes with the same value (the one added last), whether or
+        not the queue is compacted, and that a value added again after being discarded and popped is live.
+        :return:
+        """
+        for compaction_ratio in (1.0, 0.2):
+            pq: PriorityQueue[str] = PriorityQueue[str]([(0, "R"), (5, "A"), (1, "A")], lazy_deletion=True,
+                                                        compaction_ratio=compaction_ratio)
+            self.assertTrue(pq.discard("A"))
+            self.assertEqual([(0, "R"), (5, "A")], pq.pop_many(5), "Only the last A node added should be dropped.")
+        pq = PriorityQueue[str](lazy_deletion=True, compaction_ratio=1.0)
+        pq.add_values([(1, "A"), (3, "B")])
+        self.assertTrue(pq.discard("A"))
+        self.assertEqual((3, "B"), pq.pop())
+        self.assertTrue(pq.is_empty(), "The queue only holds a dead node.")
+        pq.add_value("A", 5)
+        self.assertFalse(pq.is_empty())
+        self.assertEqual((5, "A"), pq.pop())
+
+    def test_discard_readd(self):
+        """
+        checks that a value discarded and then added again straight away - cancelled and rescheduled - comes out
+        with its new priority, and that the same node object added twice is two entries.
+        :return:
+        """
+        pq: PriorityQueue[str] = PriorityQueue[str](lazy_deletion=True, compaction_ratio=1.0)
+        pq.add_value("X", 5)
+        pq.add_value("Y", 7)
+        self.assertTrue(pq.discard("X"))
+        pq.add_value("X", 1)
+        self.assertEqual([(1, "X"), (7, "Y")], pq.pop_many(5), "The cancelled node came back instead of the new one.")
+        node = (2, "Z")
+        pq.add_values([node, node])
+        self.assertTrue(pq.discard("Z"))
+        self.assertEqual([(2, "Z")], pq.pop_many(5))
+        self.assertFalse(pq.discard("Z"))
+
+    def test_discard_bounded(self):
+        """
+        checks that dead nodes don't take up room in a queue with a max_size.
+        :return:
+        """
+        pq: PriorityQueue[int] = PriorityQueue[int](lazy_deletion=True, max_size=3, compaction_ratio=1.0)
+        pq.add_values([(1, 1), (2, 2), (3, 3)])
+        pq.discard(3)
+        self.assertIsNone(pq.add_value(0, 0), "A live node was evicted while there was live room.")
+        self.assertEqual(3, pq.live_count)
+        self.assertEqual((-1, -1), pq.add_value(-1, -1), "A full queue should still refuse a node that comes first.")
+        pq.discard(2)
+        pq.add_values([(4, 4)])
+        self.assertEqual([(0, 0), (1, 1), (4, 4)], pq.pop_many(5))
+
+    def test_discard_length(self):
+        """
+        checks that len leaves out dead nodes, so that it always agrees with is_empty.
+        :return:
+        """
+        pq: PriorityQueue[str] = PriorityQueue[str](lazy_deletion=True, compaction_ratio=1.0)
+        pq.add_values([(1, "a"), (2, "b"), (3, "c")])
+        self.assertTrue(pq.discard("c"))
+        self.assertEqual(2, len(pq))
+        self.assertEqual(2, len(pq.pop_many(len(pq))))
+        self.assertEqual(0, len(pq))
+        self.assertTrue(pq.is_empty())
+        self.assertEqual(1, pq.dead_count, "The dead node should still be in my_tree.")
+
+    def test_discard_3(self):
+        """
+        checks that passing the compaction ratio sweeps out every dead node and leaves a heap.
+        :return:
+        """
+        pq: PriorityQueue[int] = PriorityQueue[int]([(i, i) for i in range(10)], heapify=True, lazy_deletion=True,
+                                                    compaction_ratio=0.3)
+        for value in (9, 8, 7):
+            pq.discard(value)
+        self.assertEqual(3, pq.dead_count, "Compaction happened too early.")
+        pq.discard(6)
+        self.assertEqual(0, pq.dead_count, "Compaction did not happen.")
+        self.assertEqual(6, len(pq))
+        self.assertTrue(pq.is_a_heap())
+        self.assertEqual([(i, i) for i in range(6)], pq.pop_many(10))
+
+    def test_discard_4(self):
+        """
+        checks a long random mix of adds, discards and pops against a plain list.
+        :return:
+        """
+        rng = random.Random(14)
+        pq: PriorityQueue[int] = PriorityQueue[int](lazy_deletion=True, stable=True)
+        live = []
+        for value in range(2000):
+            priority = rng.randrange(50)
+            pq.add_value(value, priority)
+            live.append((priority, value))
+            if rng.random() < 0.5 and live:
+                victim = live.pop(rng.randrange(len(live)))
+                self.assertTrue(pq.discard(victim[1]))
+                self.assertLessEqual(pq.dead_count, 0.5 * len(pq.my_tree), "discard did not compact.")
+            if rng.random() < 0.2 and live:
+                live.sort()
+                self.assertEqual(live[:3], pq.top_k(3), "top_k did not skip the discarded nodes.")
+                self.assertEqual(live.pop(0), pq.pop())
+            self.assertEqual(len(live), pq.live_count)
+        live.sort()
+        self.assertEqual(live, pq.pop_many(len(live) + 1))
+
+    def test_discard_5(self):
+        """
+        checks that discard needs lazy_deletion, and that melding a queue with dead nodes leaves them out.
+        :return:
+        """
+        with self.assertRaises(TypeError):
+            PriorityQueue[str]().discard("A")
+        pq: PriorityQueue[str] = PriorityQueue[str]([(2, "A")], lazy_deletion=True)
+        other: PriorityQueue[str] = PriorityQueue[str]([(1, "B"), (3, "C")], heapify=True, lazy_deletion=True)
+        other.discard("B")
+        pq.meld(other)
+        self.assertEqual([(2, "A"), (3, "C")], pq.pop_many(5), "The discarded node came back after meld.")
+
+
+if __name__ == '__main__':
+    unittest.main()
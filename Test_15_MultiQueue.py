@@ -0,0 +1,111 @@
+import random
+import threading
+import unittest
+from MultiQueueFile import MultiQueue, ProcessMultiQueue
+from PriorityQueueFile import PriorityQueue
+
+
+class MyTestCase(unittest.TestCase):
+    def test_multi_queue_1(self):
+        """
+        checks that a MultiQueue gives back every node it was given, roughly in order, and then raises.
+        :return:
+        """
+        rng = random.Random(15)
+        nodes = [(priority, priority) for priority in rng.sample(range(10_000), 2_000)]
+        for is_min_heap in (True, False):
+            mq: MultiQueue[int] = MultiQueue[int](shards=4, is_min_heap=is_min_heap, seed=1)
+            for node in nodes:
+                mq.add_value(node[1], node[0])
+            self.assertEqual(len(nodes), len(mq))
+            popped = mq.pop_many(len(nodes) + 1)
+            self.assertTrue(mq.is_empty())
+            self.assertEqual(sorted(nodes), sorted(popped), "The MultiQueue lost nodes.")
+            ordered = sorted(nodes, reverse=not is_min_heap)
+            rank_errors = [abs(ordered.index(node) - i) for i, node in enumerate(popped)]
+            self.assertLess(sum(rank_errors) / len(rank_errors), 100, "The MultiQueue is barely ordered.")
+            with self.assertRaises(IndexError):
+                mq.pop()
+
+    def test_multi_queue_2(self):
+        """
+        checks that a MultiQueue with one shard is an exact priority queue, and that make_queue is used.
+        :return:
+        """
+        mq: MultiQueue[str] = MultiQueue[str](shards=1, make_queue=lambda: PriorityQueue(stable=True))
+        mq.add_values([(2, "A"), (1, "B"), (2, "C"), (1, "D")])
+        self.assertEqual([(1, "B"), (1, "D"), (2, "A"), (2, "C")], mq.pop_many(4))
+        with self.assertRaises(ValueError):
+            MultiQueue(shards=0)
+
+    def test_multi_queue_key(self):
+        """
+        checks that shards made with a key are compared by that key, not by their raw priorities.
+        :return:
+        """
+        rng = random.Random(15)
+        nodes = [(priority, priority) for priority in rng.sample(range(10_000), 2_000)]
+        mq: MultiQueue[int] = MultiQueue[int](shards=4, seed=1, make_queue=lambda: PriorityQueue(key=lambda p: -p))
+        mq.add_values(nodes[:10])
+        for node in nodes[10:]:
+            mq.add_value(node[1], node[0])
+        popped = mq.pop_many(len(nodes))
+        ordered = sorted(nodes, reverse=True)
+        rank_errors = [abs(ordered.index(node) - i) for i, node in enumerate(popped)]
+        self.assertLess(sum(rank_errors) / len(rank_errors), 100, "The MultiQueue did not order by the shards' key.")
+
+    def test_multi_queue_3(self):
+        """
+        checks that threads adding and popping at the same time neither lose nor repeat nodes.
+        :return:
+        """
+        mq: MultiQueue[int] = MultiQueue[int](shards=8, seed=2)
+        popped = []
+
+        def produce(start: int):
+            for i in range(start, 4_000, 4):
+                mq.add_value(i, i % 97)
+
+        def consume():
+            mine = []
+            while len(mine) < 1_000:
+                try:
+                    mine.append(mq.pop()[1])
+                except IndexError:
+                    pass
+            popped.extend(mine)
+
+        workers = [threading.Thread(target=produce, args=(i,)) for i in range(4)]
+        workers += [threading.Thread(target=consume) for _ in range(4)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        self.assertEqual(list(range(4_000)), sorted(popped))
+        self.assertTrue(mq.is_empty())
+
+    def test_process_multi_queue(self):
+        """
+        checks that a ProcessMultiQueue gives back every node it was given, each batch in order.
+        :return:
+        """
+        with ProcessMultiQueue(shards=2, seed=3) as mq:
+            mq.add_values([(priority, str(priority)) for priority in range(0, 100, 2)])
+            mq.add_values([(priority, str(priority)) for priority in range(1, 100, 2)])
+            mq.add_value("x", 1000)
+            self.assertEqual(101, len(mq))
+            popped = []
+            while True:
+                batch = mq.pop_many(10)
+                if not batch:
+                    break
+                self.assertEqual(sorted(batch), batch, "pop_many gave a batch out of order.")
+                popped.extend(batch)
+            self.assertEqual(sorted([(priority, str(priority)) for priority in range(100)] + [(1000, "x")]),
+                             sorted(popped))
+            with self.assertRaises(IndexError):
+                mq.pop()
+
+
+if __name__ == '__main__':
+    unittest.main()
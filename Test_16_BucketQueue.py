@@ -0,0 +1,97 @@
+import random
+import unittest
+from BucketQueueFile import BucketQueue
+from CompactPriorityQueueFile import CompactPriorityQueue
+from PriorityQueueFile import PriorityQueue
+
+
+class MyTestCase(unittest.TestCase):
+    def test_bucket_1(self):
+        """
+        checks that PriorityQueue(engine="bucket") gives a BucketQueue that pops in order, first in first out on ties.
+        :return:
+        """
+        pq = PriorityQueue[str]([(3, "A"), (1, "B"), (3, "C")], engine="bucket")
+        self.assertIsInstance(pq, BucketQueue)
+        pq.add_value("D", 2)
+        pq.add_value("E", 1)
+        self.assertEqual(5, len(pq))
+        self.assertEqual((1, "B"), pq.peek())
+        self.assertEqual([(1, "B"), (1, "E"), (2, "D"), (3, "A"), (3, "C")], pq.pop_many(10))
+        self.assertTrue(pq.is_empty())
+        with self.assertRaises(IndexError):
+            pq.pop()
+        self.assertIsInstance(PriorityQueue(), PriorityQueue, "The heap engine should still be the default.")
+
+    def test_bucket_2(self):
+        """
+        checks that a priority that breaks monotonicity is refused, in both directions, and that clear forgets it.
+        :return:
+        """
+        pq = PriorityQueue[str]([(5, "A"), (7, "B")], engine="bucket")
+        self.assertEqual((5, "A"), pq.pop())
+        pq.add_value("C", 5)  # equal to the last pop is fine
+        with self.assertRaises(ValueError):
+            pq.add_value("D", 4)
+        pq.clear()
+        pq.add_value("D", 4)
+        self.assertEqual((4, "D"), pq.pop())
+        max_pq = PriorityQueue[str]([(5, "A"), (7, "B")], is_min_heap=False, engine="bucket")
+        self.assertEqual((7, "B"), max_pq.pop())
+        max_pq.add_value("C", 6)
+        with self.assertRaises(ValueError):
+            max_pq.add_value("D", 8)
+        self.assertEqual([(6, "C"), (5, "A")], max_pq.pop_many(3))
+        with self.assertRaises(TypeError):
+            max_pq.add_value("E", 1.5)
+
+    def test_bucket_3(self):
+        """
+        checks an event simulation, where every pop schedules events a little later, against a heap.
+        :return:
+        """
+        rng = random.Random(16)
+        bucket_pq = PriorityQueue[int](engine="bucket")
+        heap_pq = PriorityQueue[int](stable=True)
+        for i in range(100):
+            priority = rng.randrange(20)
+            bucket_pq.add_value(i, priority)
+            heap_pq.add_value(i, priority)
+        for i in range(100, 5_000):
+            node = bucket_pq.pop()
+            self.assertEqual(heap_pq.pop(), node)
+            for _ in range(rng.randrange(3)):
+                priority = node[0] + rng.randrange(20)
+                bucket_pq.add_value(i, priority)
+                heap_pq.add_value(i, priority)
+            if bucket_pq.is_empty():
+                break
+        self.assertEqual(heap_pq.pop_many(len(heap_pq)), bucket_pq.pop_many(len(bucket_pq)))
+
+    def test_bucket_4(self):
+        """
+        checks that unknown engines, and engines on subclasses, are refused.
+        :return:
+        """
+        with self.assertRaises(ValueError):
+            PriorityQueue(engine="fibonacci")
+        with self.assertRaises(ValueError):
+            CompactPriorityQueue(engine="bucket")
+
+    def test_bucket_5(self):
+        """
+        checks that priorities added from the far end of the range first, before anything is popped, still come out
+        in order, with gaps between them.
+        :return:
+        """
+        pq = PriorityQueue[int](engine="bucket")
+        pq.add_values((priority, priority) for priority in range(3000, 0, -3))
+        self.assertEqual([(priority, priority) for priority in range(3, 3001, 3)], pq.pop_many(2000))
+        max_pq = PriorityQueue[int](is_min_heap=False, engine="bucket")
+        max_pq.add_values((priority, priority) for priority in range(-10, 10))
+        max_pq.add_value(5, 5)
+        self.assertEqual([(9, 9), (8, 8), (7, 7), (6, 6), (5, 5), (5, 5)], max_pq.pop_many(6))
+
+
+if __name__ == '__main__':
+    unittest.main()
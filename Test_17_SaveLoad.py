@@ -0,0 +1,97 @@
+import os
+import random
+import tempfile
+import unittest
+from CompactPriorityQueueFile import CompactPriorityQueue
+from IndexedPriorityQueueFile import IndexedPriorityQueue
+from PriorityQueueFile import PriorityQueue
+
+
+class MyTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "queue.pq")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_save_load_1(self):
+        """
+        checks that a saved queue loads back with the same tree, with and without mmap, for min and max heaps of
+        different arities.
+        :return:
+        """
+        rng = random.Random(17)
+        nodes = [(rng.randrange(1000), f"value {i}") for i in range(500)]
+        for is_min_heap in (True, False):
+            for arity in (2, 4):
+                pq: PriorityQueue[str] = PriorityQueue[str](nodes, is_min_heap=is_min_heap, arity=arity, heapify=True)
+                pq.save(self.path)
+                for use_mmap in (True, False):
+                    loaded: PriorityQueue[str] = PriorityQueue.load(self.path, validate=True, use_mmap=use_mmap)
+                    self.assertEqual(pq.my_tree, loaded.my_tree, "The tree changed on the way through the file.")
+                    self.assertEqual(is_min_heap, loaded.is_min_heap)
+                    self.assertEqual(arity, loaded.arity)
+                self.assertEqual(pq.pop_many(500), loaded.pop_many(500))
+
+    def test_save_load_2(self):
+        """
+        checks float priorities, odd values, empty queues and loading into the other queue classes.
+        :return:
+        """
+        pq: PriorityQueue = PriorityQueue([(2.5, None), (0.5, {"a": [1, 2]}), (1.5, ("x", 3))], heapify=True)
+        pq.save(self.path)
+        self.assertEqual([(0.5, {"a": [1, 2]}), (1.5, ("x", 3)), (2.5, None)],
+                         PriorityQueue.load(self.path).pop_many(3))
+        compact = CompactPriorityQueue.load(self.path, typecode="d")
+        self.assertIsInstance(compact, CompactPriorityQueue)
+        self.assertEqual((0.5, {"a": [1, 2]}), compact.pop())
+        indexed = IndexedPriorityQueue.load(self.path)
+        self.assertEqual([0.5, 1.5, 2.5], sorted(indexed.priority_of(handle) for handle in indexed.handles()))
+        PriorityQueue().save(self.path)
+        self.assertTrue(PriorityQueue.load(self.path, validate=True).is_empty())
+
+    def test_save_load_3(self):
+        """
+        checks that validate catches a file that isn't in heap order, that other files are refused, and that
+        priorities that don't fit the format are refused.
+        :return:
+        """
+        PriorityQueue[str]([(5, "A"), (1, "B")]).save(self.path)
+        self.assertEqual([(5, "A"), (1, "B")], PriorityQueue.load(self.path).my_tree, "load should not reorder.")
+        with self.assertRaises(ValueError):
+            PriorityQueue.load(self.path, validate=True)
+        with open(self.path, "wb") as file:
+            file.write(b"not a snapshot, but long enough to have a header")
+        with self.assertRaises(ValueError):
+            PriorityQueue.load(self.path)
+        with self.assertRaises(TypeError):
+            PriorityQueue[str]([("high", "A")]).save(self.path)
+
+    def test_save_load_4(self):
+        """
+        checks that a stable queue loads back with its ties still first in, first out, and that a lazy_deletion queue
+        leaves its dead nodes out.
+        :return:
+        """
+        pq: PriorityQueue[str] = PriorityQueue[str](stable=True, lazy_deletion=True)
+        pq.add_values([(2, "A"), (1, "B"), (2, "C"), (1, "D"), (3, "E")])
+        pq.discard("D")
+        pq.save(self.path)
+        loaded: PriorityQueue[str] = PriorityQueue.load(self.path, validate=True, stable=True, lazy_deletion=True)
+        self.assertEqual(4, loaded.live_count)
+        self.assertTrue(loaded.discard("E"))
+        self.assertEqual([(1, "B"), (2, "A"), (2, "C")], loaded.pop_many(5))
+        loaded.add_values([(4, "F"), (4, "G")])
+        self.assertEqual([(4, "F"), (4, "G")], loaded.pop_many(2), "New nodes should be numbered after the old ones.")
+        for is_min_heap in (True, False):
+            pq = PriorityQueue[int](stable=True, is_min_heap=is_min_heap, key=lambda priority: priority % 3)
+            pq.add_values((i, i) for i in range(30))
+            expected = pq.top_k(30)
+            pq.save(self.path)
+            loaded = PriorityQueue.load(self.path, validate=True, stable=True, key=lambda priority: priority % 3)
+            self.assertEqual(expected, loaded.pop_many(30), "A keyed stable queue lost its tie order.")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+import os
+import random
+import tempfile
+import unittest
+from DurablePriorityQueueFile import DurablePriorityQueue
+
+
+class MyTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = self.directory.name
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_durable_1(self):
+        """
+        checks that adds and pops come back after a restart, from the log alone and from a snapshot plus a log.
+        :return:
+        """
+        rng = random.Random(18)
+        with DurablePriorityQueue(self.path, group_size=8, stable=True) as pq:
+            for i in range(100):
+                pq.add_value(f"value {i}", rng.randrange(10))
+            popped = pq.pop_many(20) + [pq.pop()]
+            pq.checkpoint()
+            pq.add_values([(rng.randrange(10), f"more {i}") for i in range(30)])
+            pq.pop_many(5)
+            expected = pq.queue.top_k(len(pq))
+        self.assertEqual(21, len(popped))
+        with DurablePriorityQueue(self.path, stable=True) as recovered:
+            self.assertEqual(expected, recovered.queue.top_k(len(recovered)), "Recovery lost or reordered nodes.")
+            recovered.pop()
+        with DurablePriorityQueue(self.path, stable=True) as recovered_again:
+            self.assertEqual(expected[1:], recovered_again.pop_many(1000))
+        self.assertEqual(["snapshot-1.pq", "wal-1.log"], sorted(os.listdir(self.path)))
+
+    def test_durable_2(self):
+        """
+        checks that records still in an unwritten group are lost in a crash, but written ones are not, and that a
+        record cut short by a crash is dropped.
+        :return:
+        """
+        pq = DurablePriorityQueue(self.path, group_size=4)
+        for i in range(6):
+            pq.add_value(i, i)
+        pq._log.close()  # crash: the group holding 4 and 5 is never written.
+        recovered = DurablePriorityQueue(self.path, group_size=1)
+        self.assertEqual([(0, 0), (1, 1), (2, 2), (3, 3)], recovered.queue.top_k(10))
+        recovered.add_value("torn", 9)
+        recovered.close()
+        log_path = os.path.join(self.path, "wal-0.log")
+        with open(log_path, "r+b") as file:
+            file.truncate(os.path.getsize(log_path) - 1)
+        recovered = DurablePriorityQueue(self.path)
+        self.assertEqual(4, len(recovered), "The torn record should have been dropped.")
+        recovered.add_value("after", 7)
+        recovered.close()
+        with DurablePriorityQueue(self.path) as recovered:
+            self.assertEqual((7, "after"), recovered.queue.top_k(5)[-1])
+
+    def test_durable_3(self):
+        """
+        checks that a crash in the middle of a checkpoint, after the new log was started but before the snapshot was
+        saved, loses nothing.
+        :return:
+        """
+        pq = DurablePriorityQueue(self.path, group_size=1, is_min_heap=False)
+        pq.add_values([(1, "A"), (3, "B"), (2, "C")])
+        pq.commit()
+        open(os.path.join(self.path, "wal-1.log"), "wb").close()
+        pq.close()
+        with DurablePriorityQueue(self.path, is_min_heap=False) as recovered:
+            self.assertEqual(1, recovered.generation)
+            self.assertEqual([(3, "B"), (2, "C"), (1, "A")], recovered.pop_many(3))
+
+
+if __name__ == '__main__':
+    unittest.main()
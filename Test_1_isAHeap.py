@@ -52,6 +52,24 @@ class MyTestCase(unittest.TestCase):
         pq7: PriorityQueue[str] = PriorityQueue[str]()
         self.assertTrue(pq7.is_a_heap(), "Did not recognize an empty heap.")
 
+    def test_heap_first_violation(self):
+        # Finding the first parent/child pair that breaks the heap.
+        pq: PriorityQueue[str] = PriorityQueue[str](tree=[[0, "a"], [6, "a"], [3, "a"], [7, "a"], [8, "a"], [2, "a"],
+                                                          [10, "a"], [9, "a"], [5, "a"]])
+        self.assertEqual((2, 5), pq.first_heap_violation(), "Did not report the first bad parent/child pair.")
+        pq.set_node_at_index((4, "a"), 5)
+        self.assertEqual((3, 8), pq.first_heap_violation(), "Did not report the next bad parent/child pair.")
+        pq.set_node_at_index((8, "a"), 8)
+        self.assertIsNone(pq.first_heap_violation(), "Reported a violation in a good heap.")
+
+    def test_heap_sampled(self):
+        # Sampled checks of a large heap and of a heap where every edge is bad.
+        good: PriorityQueue[int] = PriorityQueue[int](tree=[(i, i) for i in range(1000)])
+        self.assertTrue(good.is_a_heap(sample_size=50), "Sampled check rejected a good heap.")
+        bad: PriorityQueue[int] = PriorityQueue[int](tree=[(-i, i) for i in range(1000)])
+        self.assertFalse(bad.is_a_heap(sample_size=1), "Sampled check accepted a heap where every pair is bad.")
+        self.assertTrue(PriorityQueue[int]().is_a_heap(sample_size=10), "Sampled check rejected an empty heap.")
+
 
 if __name__ == '__main__':
     unittest.main()
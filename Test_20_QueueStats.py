@@ -0,0 +1,92 @@
+import json
+import random
+import unittest
+from IndexedPriorityQueueFile import IndexedPriorityQueue
+from PriorityQueueFile import PriorityQueue
+from QueueStatsFile import LatencyHistogram, QueueStats
+
+
+class MyTestCase(unittest.TestCase):
+    def test_stats_1(self):
+        """
+        checks the operation, comparison, swap and sift depth counts on a small heap.
+        :return:
+        """
+        pq: PriorityQueue[str] = PriorityQueue[str]([(1, "A"), (2, "B"), (3, "C"), (4, "D")])
+        stats = pq.enable_stats()
+        pq.add_value("E", 0)  # moves up past D and A
+        self.assertEqual({"add_value": 1}, stats.operations)
+        self.assertEqual(2, stats.swaps)
+        self.assertEqual(2, stats.max_sift_depth)
+        self.assertEqual(2, stats.comparisons)
+        self.assertEqual((0, "E"), pq.pop())
+        self.assertEqual(1, stats.operations["pop"])
+        self.assertEqual([(1, "A"), (2, "B"), (3, "C"), (4, "D")], pq.pop_many(4))
+        self.assertTrue(pq.is_empty())
+        self.assertEqual(1, stats.latencies["pop"].count)
+
+    def test_stats_2(self):
+        """
+        checks that snapshot(reset=True) gives JSON-ready stats and then starts again from zero, and that
+        disable_stats puts the queue back the way it was.
+        :return:
+        """
+        rng = random.Random(20)
+        pq: PriorityQueue[int] = PriorityQueue[int](arity=4)
+        stats = pq.enable_stats()
+        for i in range(500):
+            pq.add_value(i, rng.randrange(100))
+        popped = pq.pop_many(100)
+        self.assertEqual(sorted(node[0] for node in popped), [node[0] for node in popped])
+        snapshot = json.loads(json.dumps(stats.snapshot(reset=True)))
+        self.assertEqual(500, snapshot["operations"]["add_value"])
+        self.assertEqual(500, snapshot["latencies"]["add_value"]["count"])
+        self.assertGreater(snapshot["comparisons"], 0)
+        self.assertGreater(snapshot["swaps"], 0)
+        self.assertLessEqual(snapshot["max_sift_depth"], 5)
+        self.assertEqual({}, stats.operations)
+        self.assertEqual(0, stats.comparisons)
+        pq.disable_stats()
+        self.assertIs(list, type(pq.my_tree))
+        self.assertNotIn("pop", pq.__dict__)
+        self.assertIsNone(pq.stats)
+        pq.pop()
+        self.assertEqual(0, stats.comparisons, "A queue with stats off should not count anything.")
+        self.assertTrue(pq.is_a_heap())
+
+    def test_stats_3(self):
+        """
+        checks stats on an IndexedPriorityQueue, shared between two queues.
+        :return:
+        """
+        stats = QueueStats()
+        first: IndexedPriorityQueue[str] = IndexedPriorityQueue[str]()
+        second: PriorityQueue[str] = PriorityQueue[str]()
+        first.enable_stats(stats)
+        second.enable_stats(stats)
+        handle = first.add_value("A", 5)
+        first.add_value("B", 3)
+        second.add_value("C", 1)
+        first.change_priority(handle, 1)
+        self.assertEqual((1, "A"), first.pop())
+        self.assertEqual(3, stats.operations["add_value"])
+        self.assertEqual(1, stats.operations["pop"])
+        self.assertEqual(3, first.priority_of(first.handles()[0]))
+
+    def test_histogram(self):
+        """
+        checks the histogram's percentiles stay within its precision.
+        :return:
+        """
+        histogram = LatencyHistogram(significant_bits=5)
+        for nanoseconds in range(1, 100_001):
+            histogram.record(nanoseconds)
+        self.assertEqual(100_000, histogram.count)
+        self.assertEqual(100_000, histogram.max)
+        for percent in (50, 90, 99):
+            self.assertAlmostEqual(percent * 1000, histogram.percentile(percent), delta=percent * 1000 / 16)
+        self.assertEqual(0, LatencyHistogram().percentile(50))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+import logging
+import threading
+import unittest
+import KinkaidDecorators
+from KinkaidDecorators import log_start_stop_method, timing_report
+
+
+class MyTestCase(unittest.TestCase):
+    def setUp(self):
+        self.logger = logging.getLogger("Test_21_KinkaidDecorators")
+        self.logger.propagate = False
+        timing_report(reset=True)
+
+    def test_decorator_1(self):
+        """
+        checks that nested calls are logged with one more tab per level, and that the wrapped function still works.
+        :return:
+        """
+        @log_start_stop_method(logger=self.logger)
+        def outer(x):
+            return inner(x) + 1
+
+        @log_start_stop_method(logger=self.logger)
+        def inner(x):
+            return x * 2
+
+        self.logger.setLevel(logging.INFO)
+        with self.assertLogs(self.logger, logging.INFO) as logs:
+            self.assertEqual(7, outer(3))
+        self.assertEqual(["Starting method outer((3,))", "\tStarting method inner((3,))", "\tFinishing method: inner",
+                          "Finishing method: outer"], [record.getMessage() for record in logs.records])
+        self.assertEqual(6, log_start_stop_method(lambda: 6)())
+
+    def test_decorator_2(self):
+        """
+        checks that arguments are not formatted when the logger is off.
+        :return:
+        """
+        formatted = []
+
+        class Expensive:
+            def __repr__(self):
+                formatted.append(self)
+                return "Expensive()"
+
+        @log_start_stop_method(logger=self.logger)
+        def method(argument):
+            return argument
+
+        self.logger.setLevel(logging.WARNING)
+        method(Expensive())
+        self.assertEqual([], formatted, "The arguments were formatted for a message nobody will see.")
+
+    def test_decorator_3(self):
+        """
+        checks the timing aggregates, from several threads, with logging off, and that reset empties them.
+        :return:
+        """
+        @log_start_stop_method(logger=self.logger, timed=True)
+        def method():
+            return KinkaidDecorators._call_depth.get()
+
+        self.logger.setLevel(logging.WARNING)
+        depths = []
+        threads = [threading.Thread(target=lambda: depths.extend(method() for _ in range(100))) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual([1] * 400, depths, "Each thread should count its own depth.")
+        report = timing_report(reset=True)
+        name = method.__qualname__
+        self.assertEqual(400, report[name]["calls"])
+        self.assertLessEqual(report[name]["mean_seconds"], report[name]["max_seconds"])
+        self.assertEqual({}, timing_report())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+import time
+import unittest
+from PriorityQueueFile import PriorityQueue, COLOR_STARTERS, COLOR_RESET
+
+
+class MyTestCase(unittest.TestCase):
+    def test_render_1(self):
+        """
+        checks that iter_tree_lines draws the whole tree the way __str__ does, and that an empty tree draws.
+        :return:
+        """
+        pq: PriorityQueue[str] = PriorityQueue[str]([(1, "A"), (2, "B"), (3, "C"), (4, "D")])
+        lines = list(pq.iter_tree_lines())
+        self.assertEqual(["-" * 32, "              1:A              ", "      2:B            3:C      ", "  4:D  "],
+                         lines)
+        self.assertEqual("\n".join(lines), str(pq))
+        self.assertEqual("-" * 8 + "\n", str(PriorityQueue()))
+        self.assertEqual(["-" * 8], list(PriorityQueue().iter_tree_lines()))
+
+    def test_render_2(self):
+        """
+        checks that levels and root limit the drawing to part of the tree, and that it is only as wide as that part.
+        :return:
+        """
+        pq: PriorityQueue[int] = PriorityQueue[int]([(i, i) for i in range(15)])
+        top = list(pq.iter_tree_lines(levels=2))
+        self.assertEqual(["-" * 16, "      0:0      ", "  1:1    2:2  "], top)
+        subtree = list(pq.iter_tree_lines(root=2))
+        self.assertEqual(["-" * 32, "              2:2              ", "      5:5            6:6      ",
+                          " 11:11  12:12  13:13  14:14 "], subtree)
+        self.assertEqual(["-" * 8, " 14:14 "], list(pq.iter_tree_lines(root=14, levels=3)))
+        self.assertEqual(["-" * 8], list(pq.iter_tree_lines(levels=0)))
+
+    def test_render_3(self):
+        """
+        checks the colors, including an index listed twice, which takes the color of its first place in the list.
+        :return:
+        """
+        pq: PriorityQueue[str] = PriorityQueue[str]([(1, "A"), (2, "B"), (3, "C")])
+        lines = list(pq.iter_tree_lines(indices_to_color=[2, 0, 2]))
+        self.assertEqual(f"{COLOR_STARTERS[1]}      1:A      {COLOR_RESET}", lines[1])
+        self.assertEqual(f"  2:B  {COLOR_STARTERS[0]}  3:C  {COLOR_RESET}", lines[2])
+
+    def test_render_4(self):
+        """
+        checks that drawing the top of a million-node heap, with many nodes colored, doesn't touch the rest of it.
+        :return:
+        """
+        pq: PriorityQueue[int] = PriorityQueue[int]([(i, i) for i in range(1_000_000)])
+        start = time.perf_counter()
+        lines = list(pq.iter_tree_lines(levels=4, indices_to_color=range(0, 1_000_000, 7)))
+        self.assertLess(time.perf_counter() - start, 1.0)
+        self.assertEqual(5, len(lines))
+        self.assertEqual(64, len(lines[0]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+import itertools
+import random
+import unittest
+from CompactPriorityQueueFile import CompactPriorityQueue
+from IndexedPriorityQueueFile import IndexedPriorityQueue
+from PriorityQueueFile import PriorityQueue
+
+
+class MyTestCase(unittest.TestCase):
+    def test_iter_sorted(self):
+        """
+        checks that iter_sorted gives every node in pop order, lazily, without changing the tree.
+        :return:
+        """
+        rng = random.Random(23)
+        for arity in (2, 3):
+            pq: PriorityQueue[int] = PriorityQueue[int]([(rng.randrange(50), i) for i in range(300)], heapify=True,
+                                                        arity=arity, stable=True)
+            tree = list(pq.my_tree)
+            self.assertEqual(list(itertools.islice(pq.iter_sorted(), 10)), pq.top_k(10))
+            in_order = list(pq.iter_sorted())
+            self.assertEqual(tree, pq.my_tree, "iter_sorted changed the tree.")
+            self.assertEqual(pq.pop_many(300), in_order)
+        self.assertEqual([], list(PriorityQueue().iter_sorted()))
+
+    def test_heapsort(self):
+        """
+        checks that heapsort leaves my_tree in pop order, still a heap, for several kinds of queue.
+        :return:
+        """
+        rng = random.Random(24)
+        nodes = [(rng.randrange(100), i) for i in range(500)]
+        for pq in (PriorityQueue(nodes, heapify=True), PriorityQueue(nodes, heapify=True, is_min_heap=False),
+                   PriorityQueue(nodes, heapify=True, arity=4), PriorityQueue(nodes, heapify=True, stable=True),
+                   CompactPriorityQueue(nodes, heapify=True)):
+            expected = pq.top_k(500)
+            pq.heapsort()
+            in_tree = [pq._export_node(node) for node in pq.my_tree]
+            self.assertTrue(pq.is_a_heap())
+            if pq._sequence is not None:
+                self.assertEqual(expected, in_tree, "A stable queue should keep its ties in order.")
+            # otherwise, nodes with equal priorities can come out in any order.
+            self.assertEqual([node[0] for node in expected], [node[0] for node in in_tree])
+            self.assertEqual(sorted(expected), sorted(pq.pop_many(500)))
+        PriorityQueue().heapsort()
+
+    def test_drain_sorted(self):
+        """
+        checks that drain_sorted empties the queue in pop order, and that stopping early leaves the rest as a heap.
+        :return:
+        """
+        pq: PriorityQueue[str] = PriorityQueue[str](lazy_deletion=True)
+        pq.add_values([(5, "A"), (1, "B"), (4, "C"), (2, "D"), (3, "E")])
+        pq.discard("C")
+        drained = pq.drain_sorted()
+        self.assertEqual([(1, "B"), (2, "D")], list(itertools.islice(drained, 2)))
+        drained.close()
+        self.assertEqual(2, len(pq))
+        self.assertTrue(pq.is_a_heap())
+        self.assertFalse(pq.discard("B"), "A drained node should no longer be counted.")
+        self.assertEqual([(3, "E"), (5, "A")], list(pq.drain_sorted()))
+        self.assertTrue(pq.is_empty())
+
+    def test_indexed(self):
+        """
+        checks that an IndexedPriorityQueue's handles still work after heapsort and a partial drain_sorted.
+        :return:
+        """
+        pq: IndexedPriorityQueue[str] = IndexedPriorityQueue[str]()
+        handles = pq.add_values([(5, "A"), (1, "B"), (4, "C"), (2, "D"), (3, "E")])
+        pq.heapsort()
+        self.assertEqual(4, pq.priority_of(handles[2]))
+        pq.change_priority(handles[0], 0)
+        self.assertEqual((0, "A"), next(pq.drain_sorted()))
+        self.assertNotIn(handles[0], pq)
+        self.assertEqual((3, "E"), pq.remove(handles[4]))
+        self.assertEqual([(1, "B"), (2, "D"), (4, "C")], pq.pop_many(5))
+
+
+if __name__ == '__main__':
+    unittest.main()
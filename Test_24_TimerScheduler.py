@@ -0,0 +1,96 @@
+import random
+import unittest
+from TimerSchedulerFile import TimerScheduler, TimingWheel, Timer
+
+
+class MyTestCase(unittest.TestCase):
+    def test_scheduler_1(self):
+        """
+        checks that timers fire in deadline order, in batches, and not before they are due, with and without a wheel.
+        :return:
+        """
+        for wheel_tick in (None, 0.5):
+            fired = []
+            scheduler = TimerScheduler(wheel_tick=wheel_tick, wheel_slots=4, wheel_levels=2)
+            for deadline in (3.0, 1.0, 100.0, 2.5, 1.2):
+                scheduler.schedule(deadline, fired.append, deadline)
+            self.assertEqual(5, len(scheduler))
+            self.assertEqual([], scheduler.expire_until(0.9))
+            batch = scheduler.expire_until(2.5)
+            self.assertEqual([1.0, 1.2, 2.5], fired)
+            self.assertEqual([1.0, 1.2, 2.5], [timer.deadline for timer in batch])
+            self.assertTrue(all(timer.fired for timer in batch))
+            scheduler.expire_until(1000)
+            self.assertEqual([1.0, 1.2, 2.5, 3.0, 100.0], fired)
+            self.assertEqual(0, len(scheduler))
+
+    def test_scheduler_2(self):
+        """
+        checks cancelling: in the wheel, in the heap, twice, after firing, and from a callback in the same batch.
+        :return:
+        """
+        fired = []
+        scheduler = TimerScheduler(wheel_tick=1.0, wheel_slots=8, wheel_levels=1)
+        near = scheduler.schedule(2, fired.append, "near")
+        far = scheduler.schedule(50, fired.append, "far")
+        self.assertIsNotNone(near._slot)
+        self.assertTrue(far._in_heap)
+        self.assertTrue(scheduler.cancel(near))
+        self.assertTrue(scheduler.cancel(far))
+        self.assertFalse(scheduler.cancel(far))
+        self.assertEqual(0, len(scheduler))
+        last = scheduler.schedule(6, fired.append, "last")
+        scheduler.schedule(5, lambda: scheduler.cancel(last))
+        scheduler.schedule(4, fired.append, "first")
+        scheduler.expire_until(100)
+        self.assertEqual(["first"], fired)
+        self.assertTrue(last.cancelled)
+        first = scheduler.schedule(101, fired.append, "again")
+        scheduler.expire_until(101)
+        self.assertFalse(scheduler.cancel(first), "A timer that fired can't be cancelled.")
+
+    def test_scheduler_3(self):
+        """
+        checks many random timers, most of them cancelled, against a plain list, with a small wheel so that timers
+        cascade and spill into the heap.
+        :return:
+        """
+        rng = random.Random(24)
+        for wheel_tick in (None, 0.25):
+            scheduler = TimerScheduler(wheel_tick=wheel_tick, wheel_slots=8, wheel_levels=2)
+            fired = []
+            live = {}
+            now = 0.0
+            for i in range(3000):
+                deadline = now + rng.uniform(0, 40)
+                live[i] = scheduler.schedule(deadline, fired.append, i)
+                if rng.random() < 0.7:
+                    victim = rng.choice(list(live))
+                    self.assertTrue(scheduler.cancel(live.pop(victim)))
+                if rng.random() < 0.1:
+                    now += rng.uniform(0, 3)
+                    expected = sorted((timer.deadline, i) for i, timer in live.items() if timer.deadline <= now)
+                    batch = scheduler.expire_until(now)
+                    self.assertEqual([i for _, i in expected], [timer.args[0] for timer in batch])
+                    for _, i in expected:
+                        del live[i]
+            self.assertEqual(len(live), len(scheduler))
+            scheduler.expire_until(now + 100)
+            self.assertEqual(sorted(fired), sorted(set(fired)))
+            self.assertEqual(0, len(scheduler))
+
+    def test_wheel(self):
+        """
+        checks that a timing wheel refuses deadlines beyond its reach and rejects bad shapes.
+        :return:
+        """
+        wheel = TimingWheel(tick=1.0, slots=4, levels=2)
+        self.assertTrue(wheel.add(Timer(15, print, ())))
+        self.assertFalse(wheel.add(Timer(16, print, ())))
+        self.assertEqual([15], [timer.deadline for timer in wheel.advance(15)])
+        with self.assertRaises(ValueError):
+            TimingWheel(tick=0)
+
+
+if __name__ == '__main__':
+    unittest.main()
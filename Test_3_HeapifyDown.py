@@ -1,3 +1,4 @@
+import random
 import unittest
 from PriorityQueueFile import PriorityQueue
 
@@ -145,6 +146,45 @@ class MyTestCase(unittest.TestCase):
                          "Heapify_down for a heap with an even number of nodes where we heapify mostly "
                          "to the right")
 
+    def test_heapify_Down_8(self):
+        """
+        checks that a large heap pops out in order, for both min and max heaps.
+        :return:
+        """
+        rng = random.Random(8)
+        priorities = [rng.randrange(500) for _ in range(5000)]
+        for is_min_heap in (True, False):
+            pq: PriorityQueue[int] = PriorityQueue[int](is_min_heap=is_min_heap)
+            for i, priority in enumerate(priorities):
+                pq.add_value(value=i, priority=priority)
+            popped = [pq.pop()[0] for _ in range(len(priorities))]
+            self.assertEqual(sorted(priorities, reverse=not is_min_heap), popped,
+                             f"Items were not removed in order ({is_min_heap = }).")
+
+    def test_heapify_Down_9(self):
+        """
+        checks heapify down and popping in heaps with more than two children per node.
+        :return:
+        """
+        items = [(9, "A"), (3, "B"), (2, "C"), (2, "D"), (5, "E"), (4, "F"), (7, "G"), (8, "H")]
+        expected = [(2, "C"), (3, "B"), (8, "H"), (2, "D"), (5, "E"), (4, "F"), (7, "G"), (9, "A")]
+
+        pq: PriorityQueue[str] = PriorityQueue[str](tree=items, is_min_heap=True, arity=3)
+        self.assertEqual(range(1, 4), pq.children_of_index(0), "The root of a 3-ary heap should have 3 children.")
+        self.assertEqual(2, pq.parent_of_index(7), "Wrong parent index in a 3-ary heap.")
+        pq.heapify_down(index=0)
+        self.assertEqual(expected, pq.my_tree, "When several children tie, the leftmost one should move up.")
+
+        rng = random.Random(9)
+        priorities = [rng.randrange(100) for _ in range(1000)]
+        for arity in (3, 4, 8):
+            pq = PriorityQueue[int](arity=arity)
+            for i, priority in enumerate(priorities):
+                pq.add_value(value=i, priority=priority)
+            self.assertTrue(pq.is_a_heap(), f"Adding values did not make a {arity}-ary heap.")
+            popped = [pq.pop()[0] for _ in range(len(priorities))]
+            self.assertEqual(sorted(priorities), popped, f"Items were not removed in order ({arity = }).")
+
 
 if __name__ == '__main__':
     unittest.main()
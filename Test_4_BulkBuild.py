@@ -0,0 +1,51 @@
+import unittest
+from PriorityQueueFile import PriorityQueue
+
+
+class MyTestCase(unittest.TestCase):
+    def test_build_1(self):
+        """
+        checks that the constructor can build a heap from an unordered tree.
+        :return:
+        """
+        items = [(6, 'Jrnl'), (2, 'Dance'), (1, 'Choir'), (9, 'Theat'), (5, 'Photo'), (7, 'Film'), (3, 'Ceram'),
+                 (13, 'Orch'), (11, 'ChTh'), (14, 'MxMd'), (8, 'DrwPt'), (10, 'Tech'), (12, 'Sclp'), (4, 'Band')]
+
+        pq: PriorityQueue[str] = PriorityQueue[str](tree=items, is_min_heap=True, heapify=True)
+        self.assertTrue(pq.is_a_heap(), "The constructor should have built a heap.")
+        self.assertEqual(sorted(items), sorted(pq.my_tree), "Building the heap should not lose or add nodes.")
+
+        max_pq: PriorityQueue[str] = PriorityQueue[str](tree=items, is_min_heap=False, heapify=True)
+        self.assertTrue(max_pq.is_a_heap(), "The constructor should have built a max heap.")
+        self.assertEqual((14, 'MxMd'), max_pq.peek(), "The max heap has the wrong root.")
+
+    def test_build_2(self):
+        """
+        checks that add_values repairs the heap both for a few new nodes and for many.
+        :return:
+        """
+        pq: PriorityQueue[int] = PriorityQueue[int](tree=[(i, i) for i in range(100)])
+        pq.add_values([(-1, -1), (50, 50)])
+        self.assertTrue(pq.is_a_heap(), "A small batch should leave a heap.")
+        pq.add_values([(p, p) for p in range(200, -200, -1)])
+        self.assertTrue(pq.is_a_heap(), "A large batch should leave a heap.")
+        self.assertEqual(502, len(pq), "add_values lost or added nodes.")
+        self.assertEqual((-199, -199), pq.pop(), "Popped the wrong node after add_values.")
+
+    def test_build_3(self):
+        """
+        checks that a lazy add_values waits until peek or pop to rebuild the heap.
+        :return:
+        """
+        pq: PriorityQueue[str] = PriorityQueue[str]()
+        pq.add_values([(5, "e"), (4, "d"), (3, "c")], lazy=True)
+        pq.add_values([(2, "b")], lazy=True)
+        pq.add_value("a", priority=1)
+        self.assertFalse(pq.is_a_heap(), "A lazy add_values should not have rebuilt the heap yet.")
+        self.assertEqual((1, "a"), pq.peek(), "peek should rebuild before answering.")
+        self.assertTrue(pq.is_a_heap(), "peek should have left a heap.")
+        self.assertEqual([1, 2, 3, 4, 5], [pq.pop()[0] for _ in range(5)], "Nodes were popped out of order.")
+
+
+if __name__ == '__main__':
+    unittest.main()
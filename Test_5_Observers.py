@@ -0,0 +1,84 @@
+import unittest
+from CompactPriorityQueueFile import CompactPriorityQueue
+from IndexedPriorityQueueFile import IndexedPriorityQueue
+from PriorityQueueFile import PriorityQueue, HeapObserver
+
+
+class RecordingObserver(HeapObserver[str]):
+    def __init__(self):
+        self.events = []
+
+    def node_added(self, queue, node):
+        self.events.append(("added", node))
+
+    def node_popped(self, queue, node):
+        self.events.append(("popped", node))
+
+
+class SiftRecordingObserver(HeapObserver[str]):
+    def __init__(self):
+        self.steps = []
+
+    def sifting_down(self, queue, index):
+        self.steps.append((index, queue.my_tree[index][1]))
+
+
+class MyTestCase(unittest.TestCase):
+    def test_observer_1(self):
+        """
+        checks that an observer hears about every add and pop, in order.
+        :return:
+        """
+        observer = RecordingObserver()
+        pq: PriorityQueue[str] = PriorityQueue[str](observer=observer)
+        pq.add_value("B", priority=2)
+        pq.add_value("A", priority=1)
+        pq.pop()
+        self.assertEqual([("added", (2, "B")), ("added", (1, "A")), ("popped", (1, "A"))], observer.events,
+                         "The observer missed or misordered events.")
+
+    def test_observer_2(self):
+        """
+        checks that queues are untraced unless asked, and that tracing can be turned off per queue.
+        :return:
+        """
+        self.assertIsNone(PriorityQueue().observer, "Tracing should be off by default.")
+        observer = RecordingObserver()
+        pq: PriorityQueue[str] = PriorityQueue[str](observer=observer)
+        pq.observer = None
+        pq.add_value("A", priority=1)
+        self.assertEqual([], observer.events, "A detached observer should not hear anything.")
+
+    def test_observer_sifting(self):
+        """
+        checks that the observer is told about every level heapify_down takes a node through, with the node already
+        in place there, and that the traced sift leaves the same heap as the untraced one.
+        :return:
+        """
+        nodes = [(1, "A"), (2, "B"), (3, "C"), (4, "D"), (5, "E"), (6, "F"), (7, "G")]
+        for make_queue in (PriorityQueue, CompactPriorityQueue, IndexedPriorityQueue):
+            observer = SiftRecordingObserver()
+            pq = make_queue(observer=observer)
+            pq.add_values(nodes)
+            untraced = make_queue()
+            untraced.add_values(nodes)
+            observer.steps.clear()
+            self.assertEqual(untraced.pop(), pq.pop())
+            self.assertEqual([(0, "G"), (1, "G"), (3, "G")], observer.steps, f"{make_queue.__name__} missed a level.")
+            self.assertEqual(list(untraced.my_tree), list(pq.my_tree))
+            self.assertEqual(untraced.pop_many(6), pq.pop_many(6))
+
+    def test_observer_indexed(self):
+        """
+        checks that an IndexedPriorityQueue hands its observer (priority, value) nodes, without their handles.
+        :return:
+        """
+        observer = RecordingObserver()
+        pq: IndexedPriorityQueue[str] = IndexedPriorityQueue[str](observer=observer)
+        pq.add_value("A", priority=1)
+        pq.pop()
+        self.assertEqual([("added", (1, "A")), ("popped", (1, "A"))], observer.events)
+
+
+if __name__ == '__main__':
+    unittest.main()
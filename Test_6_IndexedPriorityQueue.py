@@ -0,0 +1,70 @@
+import random
+import unittest
+from IndexedPriorityQueueFile import IndexedPriorityQueue
+
+
+class MyTestCase(unittest.TestCase):
+    def check_positions(self, pq: IndexedPriorityQueue):
+        self.assertTrue(pq.is_a_heap(), "The queue is no longer a heap.")
+        for index, node in enumerate(pq.my_tree):
+            self.assertEqual(index, pq._positions[node[2]], f"The position of handle {node[2]} is out of date.")
+        self.assertEqual(len(pq.my_tree), len(pq._positions), "The position map has extra or missing handles.")
+
+    def test_indexed_1(self):
+        """
+        checks that priorities can be lowered and raised through their handles.
+        :return:
+        """
+        pq: IndexedPriorityQueue[str] = IndexedPriorityQueue[str]()
+        handles = {name: pq.add_value(name, priority) for priority, name in
+                   [(5, "A"), (3, "B"), (8, "C"), (1, "D"), (9, "E"), (4, "F")]}
+        pq.change_priority(handles["E"], 0)
+        self.check_positions(pq)
+        self.assertEqual((0, "E"), pq.peek(), "Decreasing a key should have brought E to the front.")
+        pq.change_priority(handles["E"], 10)
+        self.check_positions(pq)
+        self.assertEqual(10, pq.priority_of(handles["E"]), "The new priority was not stored.")
+        self.assertEqual(["D", "B", "F", "A", "C", "E"], [pq.pop()[1] for _ in range(6)],
+                         "Nodes came out in the wrong order after changing priorities.")
+        self.assertNotIn(handles["A"], pq, "Popped handles should no longer be in the queue.")
+
+    def test_indexed_2(self):
+        """
+        checks that any node can be removed through its handle.
+        :return:
+        """
+        pq: IndexedPriorityQueue[int] = IndexedPriorityQueue[int](is_min_heap=False)
+        handles = pq.add_values([(p, p) for p in range(20)])
+        self.assertEqual((7, 7), pq.remove(handles[7]), "remove gave back the wrong node.")
+        self.assertEqual((19, 19), pq.remove(handles[19]), "Removing the root gave back the wrong node.")
+        self.check_positions(pq)
+        with self.assertRaises(KeyError):
+            pq.remove(handles[7])
+        self.assertEqual([p for p in range(18, -1, -1) if p != 7], [pq.pop()[0] for _ in range(18)],
+                         "Nodes came out in the wrong order after removals.")
+
+    def test_indexed_3(self):
+        """
+        checks positions stay correct through a long random mix of operations.
+        :return:
+        """
+        rng = random.Random(3)
+        pq: IndexedPriorityQueue[int] = IndexedPriorityQueue[int]()
+        live = []
+        for step in range(2000):
+            choice = rng.random()
+            if choice < 0.4 or not live:
+                live.append(pq.add_value(step, rng.randrange(100)))
+            elif choice < 0.6:
+                pq.change_priority(rng.choice(live), rng.randrange(100))
+            elif choice < 0.8:
+                handle = live.pop(rng.randrange(len(live)))
+                pq.remove(handle)
+            else:
+                pq.pop()
+                live = [handle for handle in live if handle in pq]
+        self.check_positions(pq)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+import random
+import unittest
+from CompactPriorityQueueFile import CompactPriorityQueue
+from PriorityQueueFile import PriorityQueue
+
+
+class MyTestCase(unittest.TestCase):
+    def test_compact_1(self):
+        """
+        checks that the compact queue builds the same heap as the tuple queue, through the same API.
+        :return:
+        """
+        items = [[0, "AB"], [7, "CD"], [3, "EF"], [4, "GH"], [8, "IJ"], [10, "KL"], [5, "MN"], [13, "OP"], [6, "QR"],
+                 [12, "ST"], [2, "UV"], [1, "WX"], [9, "YZ"]]
+        for is_min_heap in (True, False):
+            compact: CompactPriorityQueue[str] = CompactPriorityQueue[str](is_min_heap=is_min_heap)
+            plain: PriorityQueue[str] = PriorityQueue[str](is_min_heap=is_min_heap)
+            for item in items:
+                compact.add_value(value=item[1], priority=item[0])
+                plain.add_value(value=item[1], priority=item[0])
+            self.assertEqual(plain.my_tree, compact.my_tree, "The compact queue built a different heap.")
+            self.assertEqual(plain.node_at_index(4), compact.node_at_index(4), "node_at_index disagrees.")
+            self.assertEqual(plain.pop(), compact.pop(), "pop disagrees.")
+            self.assertEqual(plain.my_tree, compact.my_tree, "The trees differ after a pop.")
+
+    def test_compact_2(self):
+        """
+        checks set_node_at_index, heapify_down and bulk building on float priorities.
+        :return:
+        """
+        items = [(6.5, 'Jrnl'), (2.5, 'Dance'), (1.5, 'Choir'), (9.5, 'Theat'), (5.5, 'Photo'), (7.5, 'Film')]
+        pq: CompactPriorityQueue[str] = CompactPriorityQueue[str](tree=items, typecode="d")
+        self.assertEqual((9.5, 'Theat'), pq.set_node_at_index((0.5, 'Band'), 3), "Did not return the old node.")
+        self.assertFalse(pq.is_a_heap(), "This tree should not be a heap.")
+        pq.build_heap()
+        self.assertTrue(pq.is_a_heap(), "build_heap should have made a heap.")
+        self.assertEqual((0.5, 'Band'), pq.peek(), "The wrong node is at the root.")
+
+    def test_compact_3(self):
+        """
+        checks that a large compact queue pops out in order.
+        :return:
+        """
+        rng = random.Random(3)
+        priorities = [rng.randrange(-1000, 1000) for _ in range(3000)]
+        pq: CompactPriorityQueue[int] = CompactPriorityQueue[int]()
+        pq.add_values((priority, i) for i, priority in enumerate(priorities))
+        self.assertEqual(sorted(priorities), [pq.pop()[0] for _ in range(len(priorities))],
+                         "Items were not removed in order.")
+        self.assertTrue(pq.is_empty(), "The queue should be empty.")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import random
+import unittest
+from IndexedPriorityQueueFile import IndexedPriorityQueue
+from PriorityQueueFile import PriorityQueue
+
+
+class MyTestCase(unittest.TestCase):
+    def test_batch_1(self):
+        """
+        checks that push_many and pop_many agree with adding and popping one at a time.
+        :return:
+        """
+        rng = random.Random(1)
+        priorities = [rng.randrange(50) for _ in range(300)]
+        values = list(range(300))
+        for is_min_heap in (True, False):
+            pq: PriorityQueue[int] = PriorityQueue[int](is_min_heap=is_min_heap)
+            pq.push_many(priorities, values)
+            self.assertTrue(pq.is_a_heap(), "push_many did not leave a heap.")
+            first = pq.pop_many(64)
+            self.assertEqual(sorted(priorities, reverse=not is_min_heap)[:64], [node[0] for node in first],
+                             "pop_many gave back the wrong nodes.")
+            self.assertEqual(236, len(pq), "pop_many removed the wrong number of nodes.")
+            self.assertEqual(236, len(pq.pop_many(512)), "pop_many should stop when the queue runs out.")
+            self.assertTrue(pq.is_empty(), "The queue should be empty.")
+        with self.assertRaises(ValueError):
+            PriorityQueue().push_many([1, 2], ["a"])
+
+    def test_batch_2(self):
+        """
+        checks that top_k gives the best nodes in order, without changing the queue.
+        :return:
+        """
+        items = [(6, 'Jrnl'), (2, 'Dance'), (1, 'Choir'), (9, 'Theat'), (5, 'Photo'), (7, 'Film'), (3, 'Ceram'),
+                 (13, 'Orch'), (11, 'ChTh'), (14, 'MxMd'), (8, 'DrwPt'), (10, 'Tech'), (12, 'Sclp'), (4, 'Band')]
+        pq: PriorityQueue[str] = PriorityQueue[str](tree=items, heapify=True)
+        before = list(pq.my_tree)
+        self.assertEqual([(1, 'Choir'), (2, 'Dance'), (3, 'Ceram'), (4, 'Band'), (5, 'Photo')], pq.top_k(5),
+                         "top_k gave the wrong nodes.")
+        self.assertEqual(sorted(items), pq.top_k(100), "top_k of more than the queue holds should give everything.")
+        self.assertEqual(before, pq.my_tree, "top_k should not change the tree.")
+        self.assertEqual([], PriorityQueue().top_k(3), "top_k of an empty queue should be empty.")
+
+    def test_batch_3(self):
+        """
+        checks that the indexed queue's batch operations keep its handles straight.
+        :return:
+        """
+        pq: IndexedPriorityQueue[str] = IndexedPriorityQueue[str]()
+        handles = pq.push_many([4, 2, 3, 1], ["D", "B", "C", "A"])
+        self.assertEqual([(1, "A"), (2, "B")], pq.top_k(2), "top_k should hide the handles.")
+        self.assertEqual([(1, "A"), (2, "B")], pq.pop_many(2), "pop_many should hide the handles.")
+        self.assertNotIn(handles[3], pq, "Popped handles should no longer be in the queue.")
+        pq.change_priority(handles[0], 0)
+        self.assertEqual((0, "D"), pq.peek(), "The remaining handles should still work.")
+
+
+if __name__ == '__main__':
+    unittest.main()
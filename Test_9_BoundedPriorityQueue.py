@@ -0,0 +1,53 @@
+import random
+import unittest
+from PriorityQueueFile import PriorityQueue
+
+
+class MyTestCase(unittest.TestCase):
+    def test_bounded_1(self):
+        """
+        checks that a bounded min heap keeps the highest scores from a stream.
+        :return:
+        """
+        rng = random.Random(1)
+        scores = [rng.randrange(10_000) for _ in range(5000)]
+        pq: PriorityQueue[int] = PriorityQueue[int](is_min_heap=True, max_size=10)
+        for i, score in enumerate(scores):
+            pq.add_value(value=i, priority=score)
+            self.assertLessEqual(len(pq), 10, "The queue grew past its max_size.")
+        self.assertTrue(pq.is_a_heap(), "The bounded queue is no longer a heap.")
+        self.assertEqual(sorted(scores)[-10:], [pq.pop()[0] for _ in range(10)], "Did not keep the 10 best scores.")
+
+    def test_bounded_2(self):
+        """
+        checks what add_value hands back once the queue is full, and that add_values respects max_size too.
+        :return:
+        """
+        pq: PriorityQueue[str] = PriorityQueue[str](is_min_heap=True, max_size=3)
+        self.assertIsNone(pq.add_value("B", priority=5), "Nothing should be evicted before the queue is full.")
+        pq.add_values([(7, "C"), (6, "D")])
+        self.assertEqual((2, "X"), pq.add_value("X", priority=2), "A low score should be rejected.")
+        self.assertEqual((5, "B"), pq.add_value("E", priority=9), "A high score should evict the lowest.")
+        pq.add_values([(1, "Y"), (8, "F"), (10, "G")])
+        self.assertEqual([(8, "F"), (9, "E"), (10, "G")], pq.pop_many(3), "add_values did not keep the best three.")
+        with self.assertRaises(ValueError):
+            PriorityQueue(tree=[(1, "a"), (2, "b")], max_size=1)
+
+    def test_bounded_3(self):
+        """
+        checks pushpop and replace on their own.
+        :return:
+        """
+        pq: PriorityQueue[str] = PriorityQueue[str](tree=[(1, "A"), (3, "B"), (2, "C")], is_min_heap=True)
+        self.assertEqual((0, "Z"), pq.pushpop("Z", priority=0), "pushpop should give back a node that beats the front.")
+        self.assertEqual((1, "Q"), pq.pushpop("Q", priority=1), "pushpop should give back a node that ties the front.")
+        self.assertEqual((1, "A"), pq.pushpop("W", priority=4), "pushpop should evict the front for a later node.")
+        self.assertEqual([(2, "C"), (3, "B"), (4, "W")], pq.my_tree, "pushpop left the wrong tree.")
+        self.assertEqual((2, "C"), pq.replace("V", priority=0), "replace should always give back the old front.")
+        self.assertEqual((0, "V"), pq.peek(), "replace did not put the new node in place.")
+        with self.assertRaises(IndexError):
+            PriorityQueue().replace("A", priority=1)
+
+
+if __name__ == '__main__':
+    unittest.main()
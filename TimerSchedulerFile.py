@@ -0,0 +1,192 @@
+import operator
+from typing import Any, Callable, Dict, List, Optional
+
+from PriorityQueueFile import PriorityQueue
+"""
+A timer queue on top of PriorityQueue: schedule callbacks for deadlines, cancel them in O(1), and run everything
+that has come due with one call to expire_until(now). Deadlines are plain numbers, e.g. from time.monotonic(); the
+scheduler never reads a clock itself.
+"""
+
+
+class Timer:
+    """
+    One scheduled callback, as handed back by TimerScheduler.schedule; pass it to cancel to call it off.
+    """
+    __slots__ = ("deadline", "callback", "args", "cancelled", "fired", "_slot", "_in_heap")
+
+    def __init__(self, deadline: float, callback: Callable[..., Any], args: tuple):
+        self.deadline = deadline
+        self.callback = callback
+        self.args = args
+        self.cancelled = False
+        self.fired = False
+        self._slot: Optional[Dict["Timer", None]] = None  # the timing wheel slot holding this timer, if any
+        self._in_heap = False
+
+    def __repr__(self):
+        state = "cancelled" if self.cancelled else "fired" if self.fired else "pending"
+        return f"Timer({self.deadline!r}, {self.callback!r}, {state})"
+
+
+class TimingWheel:
+    """
+    A hierarchical timing wheel: levels of slots rings, each slot of level i covering slots ** i ticks. A timer goes
+    in the lowest level whose ring covers its deadline, in O(1); as the wheel turns past the start of a higher-level
+    slot, that slot's timers are spread over the levels below ("cascaded"). Each slot is a dict, used as an ordered
+    set, so a timer can be taken out of it in O(1).
+    """
+
+    def __init__(self, tick: float, slots: int = 256, levels: int = 3, start: float = 0.0):
+        """
+        :param tick: how much time one slot of the lowest level covers.
+        :param slots: how many slots each level has.
+        :param levels: how many levels there are. Deadlines more than about slots ** levels ticks away don't fit.
+        :param start: the time the wheel starts at.
+        """
+        if tick <= 0 or slots < 2 or levels < 1:
+            raise ValueError("A TimingWheel needs a positive tick, at least 2 slots and at least 1 level.")
+        self.tick = tick
+        self.slots = slots
+        self.levels = levels
+        self.current_tick = int(start // tick)
+        self.wheels: List[List[Dict[Timer, None]]] = [[{} for _ in range(slots)] for _ in range(levels)]
+        self._spans = [slots ** level for level in range(levels + 1)]  # how many ticks a slot of each level covers
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def add(self, timer: Timer) -> bool:
+        """
+        puts a timer in its slot. A deadline already past goes in the slot for the current tick.
+        :return: False if the deadline is too far away for the wheel, in which case the timer was not added
+        """
+        timer_tick = max(int(timer.deadline // self.tick), self.current_tick)
+        spans = self._spans
+        for level in range(self.levels):
+            # the lowest level whose current ring - everything that shares the current tick's higher digits - holds it.
+            if timer_tick // spans[level + 1] == self.current_tick // spans[level + 1]:
+                slot = self.wheels[level][timer_tick // spans[level] % self.slots]
+                slot[timer] = None
+                timer._slot = slot
+                self.size += 1
+                return True
+        return False
+
+    def remove(self, timer: Timer):
+        del timer._slot[timer]
+        timer._slot = None
+        self.size -= 1
+
+    def _take_slot(self, slot: Dict[Timer, None]) -> List[Timer]:
+        timers = list(slot)
+        slot.clear()
+        self.size -= len(timers)
+        for timer in timers:
+            timer._slot = None
+        return timers
+
+    def advance(self, now: float) -> List[Timer]:
+        """
+        turns the wheel to now, taking out every timer whose deadline is no later than now.
+        :return: the timers taken out, in no particular order
+        """
+        now_tick = int(now // self.tick)
+        level_zero = self.wheels[0]
+        due = []
+        if self.size == 0:
+            self.current_tick = max(self.current_tick, now_tick)
+        while self.current_tick < now_tick:
+            # every deadline in the current tick's slot is now in the past.
+            due.extend(self._take_slot(level_zero[self.current_tick % self.slots]))
+            self.current_tick += 1
+            for level in range(self.levels - 1, 0, -1):
+                if self.current_tick % self._spans[level] == 0:
+                    slot = self.wheels[level][self.current_tick // self._spans[level] % self.slots]
+                    for timer in self._take_slot(slot):
+                        self.add(timer)
+            if self.size == 0:
+                self.current_tick = now_tick
+        slot = level_zero[self.current_tick % self.slots]
+        for timer in [timer for timer in slot if timer.deadline <= now]:
+            self.remove(timer)
+            due.append(timer)
+        return due
+
+
+class TimerScheduler:
+    """
+    Schedules callbacks for deadlines. Timers wait in a lazy_deletion PriorityQueue keyed on their deadlines, so
+    cancel only marks them dead (see PriorityQueue.discard), and the queue sweeps them out once there are enough.
+    With wheel_tick set, a TimingWheel in front of the queue takes every timer due within its reach, so that only
+    far-off timers go in the heap. Timers with the same deadline may fire in any order. Use it from one thread.
+    """
+
+    def __init__(self, wheel_tick: Optional[float] = None, wheel_slots: int = 256, wheel_levels: int = 3,
+                 start: float = 0.0):
+        """
+        :param wheel_tick: if given, put a TimingWheel with this tick (and wheel_slots and wheel_levels) in front of
+        the heap.
+        :param start: the time now, for the wheel.
+        """
+        self.heap: PriorityQueue[Timer] = PriorityQueue(lazy_deletion=True)
+        self.heap.observer = None
+        self.wheel: Optional[TimingWheel] = None
+        if wheel_tick is not None:
+            self.wheel = TimingWheel(wheel_tick, wheel_slots, wheel_levels, start)
+
+    def __len__(self):
+        """
+        how many timers are waiting.
+        """
+        return self.heap.live_count + (len(self.wheel) if self.wheel is not None else 0)
+
+    def schedule(self, deadline: float, callback: Callable[..., Any], *args: Any) -> Timer:
+        """
+        arranges for callback(*args) to be called by the first expire_until(now) with now >= deadline.
+        :return: the Timer, for cancelling it
+        """
+        timer = Timer(deadline, callback, args)
+        if self.wheel is None or not self.wheel.add(timer):
+            self.heap.add_value(timer, deadline)
+            timer._in_heap = True
+        return timer
+
+    def cancel(self, timer: Timer) -> bool:
+        """
+        calls off a timer in O(1), if it hasn't fired yet.
+        :return: whether the timer was still waiting to fire
+        """
+        if timer.cancelled or timer.fired:
+            return False
+        timer.cancelled = True
+        if timer._slot is not None:
+            self.wheel.remove(timer)
+        elif timer._in_heap:
+            self.heap.discard(timer)
+            timer._in_heap = False
+        return True
+
+    def expire_until(self, now: float) -> List[Timer]:
+        """
+        takes out every timer due by now, all at once, then calls their callbacks in deadline order. Timers that a
+        callback schedules for no later than now wait for the next call; timers a callback cancels before their turn
+        don't fire.
+        :return: the timers that fired, in the order they fired
+        """
+        due = self.wheel.advance(now) if self.wheel is not None else []
+        heap = self.heap
+        while not heap.is_empty() and heap.peek()[0] <= now:
+            timer = heap.pop()[1]
+            timer._in_heap = False
+            due.append(timer)
+        due.sort(key=operator.attrgetter("deadline"))
+        fired = []
+        for timer in due:
+            if timer.cancelled:
+                continue
+            timer.fired = True
+            timer.callback(*timer.args)
+            fired.append(timer)
+        return fired